@@ -15,33 +15,48 @@ FREQUENCY = 42  # Lower frequency for deeper, more soothing feel
 VOLUME = 0.08  # Very quiet (8% volume)
 
 # Generate a smooth sine wave with gentle variation for natural feel
-t = np.linspace(0, DURATION, int(SAMPLE_RATE * DURATION), False)
+# float32 throughout - half the bytes of float64 and plenty for 16-bit output
+t = np.linspace(0, DURATION, int(SAMPLE_RATE * DURATION), False, dtype=np.float32)
 
 # Base frequency with very gentle, slow modulation for organic feel
 base_freq = FREQUENCY
-modulation = 0.15 * np.sin(2 * np.pi * 0.2 * t)  # Very gentle, slow modulation
-frequency = base_freq + modulation
+# Phase of the fundamental: 2*pi*(base_freq + 0.15*sin(2*pi*0.2*t))*t
+# Built in place so no per-step temporaries are allocated
+phase = np.multiply(2 * np.pi * 0.2, t)
+np.sin(phase, out=phase)
+phase *= 0.15  # Very gentle, slow modulation
+phase += base_freq
+phase *= t
+phase *= 2 * np.pi
 
 # Generate smooth waveform with subtle harmonics for richness
 # Primary tone (fundamental)
-waveform = np.sin(2 * np.pi * frequency * t)
+waveform = np.sin(phase)
+scratch = np.empty_like(phase)
 # Add very subtle second harmonic (octave) at low volume for warmth
-waveform += 0.15 * np.sin(2 * np.pi * frequency * 2 * t)
+np.multiply(phase, 2, out=scratch)
+np.sin(scratch, out=scratch)
+scratch *= 0.15
+waveform += scratch
 # Add very subtle third harmonic for smoothness
-waveform += 0.08 * np.sin(2 * np.pi * frequency * 3 * t)
+np.multiply(phase, 3, out=scratch)
+np.sin(scratch, out=scratch)
+scratch *= 0.08
+waveform += scratch
 # Normalize to prevent clipping
-waveform = waveform / np.max(np.abs(waveform))
+waveform /= np.max(np.abs(waveform))
 
 # Apply smooth, longer fade in/out for seamless looping
 fade_samples = int(SAMPLE_RATE * 0.3)  # 300ms fade for ultra-smooth transition
 # Use a smoother fade curve (sine-based instead of linear)
-fade_in = np.sin(np.linspace(0, np.pi/2, fade_samples))
-fade_out = np.sin(np.linspace(np.pi/2, 0, fade_samples))
-waveform[:fade_samples] *= fade_in
-waveform[-fade_samples:] *= fade_out
+fade_in = np.sin(np.linspace(0, np.pi/2, fade_samples, dtype=np.float32))
+fade_out = fade_in[::-1]  # Mirror of the fade in, no second array
+np.multiply(waveform[:fade_samples], fade_in, out=waveform[:fade_samples])
+np.multiply(waveform[-fade_samples:], fade_out, out=waveform[-fade_samples:])
 
 # Apply volume and convert to 16-bit integer
-waveform = (waveform * VOLUME * 32767).astype(np.int16)
+waveform *= VOLUME * 32767
+waveform = waveform.astype(np.int16)
 
 # Save as WAV file
 output_file = sys.argv[1] if len(sys.argv) > 1 else "vibration.wav"
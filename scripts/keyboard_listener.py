@@ -5,17 +5,25 @@ Simple toggle mode: Press Right Option to start recording, press again to stop.
 """
 
 import sys
-from pynput import keyboard
-from pynput.keyboard import Key
+import Quartz
+
+# macOS virtual keycode for the Right Option key
+RIGHT_OPTION_KEYCODE = 61
 
 # Track recording state
 is_recording = False
 
-def on_press(key):
+def on_event(proxy, event_type, event, refcon):
     global is_recording
 
-    # Only respond to Right Option key (Key.alt_r on macOS)
-    if key == Key.alt_r:
+    # macOS disables slow or interrupted taps - turn it back on
+    if event_type in (Quartz.kCGEventTapDisabledByTimeout, Quartz.kCGEventTapDisabledByUserInput):
+        Quartz.CGEventTapEnable(tap, True)
+        return event
+
+    # Modifier keys only emit flags-changed events; the Alternate flag is set on press
+    keycode = Quartz.CGEventGetIntegerValueField(event, Quartz.kCGKeyboardEventKeycode)
+    if keycode == RIGHT_OPTION_KEYCODE and Quartz.CGEventGetFlags(event) & Quartz.kCGEventFlagMaskAlternate:
         # Toggle recording state
         is_recording = not is_recording
 
@@ -24,13 +32,29 @@ def on_press(key):
         else:
             print("TOGGLE_OFF", flush=True)
 
-def on_release(key):
-    # We don't need to track key releases anymore
-    pass
+    return event
 
 if __name__ == "__main__":
+    # Listen-only tap on modifier changes: ordinary keystrokes are filtered
+    # out by the window server and never reach Python
+    tap = Quartz.CGEventTapCreate(
+        Quartz.kCGSessionEventTap,
+        Quartz.kCGHeadInsertEventTap,
+        Quartz.kCGEventTapOptionListenOnly,
+        Quartz.CGEventMaskBit(Quartz.kCGEventFlagsChanged),
+        on_event,
+        None,
+    )
+
+    if tap is None:
+        print("Failed to create event tap - grant Accessibility permissions (see scripts/grant-accessibility.md)", file=sys.stderr, flush=True)
+        sys.exit(1)
+
+    source = Quartz.CFMachPortCreateRunLoopSource(None, tap, 0)
+    Quartz.CFRunLoopAddSource(Quartz.CFRunLoopGetCurrent(), source, Quartz.kCFRunLoopCommonModes)
+    Quartz.CGEventTapEnable(tap, True)
+
     print("READY", flush=True)
 
     # Start listening for keyboard events
-    with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
-        listener.join()
+    Quartz.CFRunLoopRun()
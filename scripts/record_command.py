@@ -7,6 +7,7 @@ import pyaudio
 import wave
 import numpy as np
 import sys
+import math
 import warnings
 
 # Suppress warnings
@@ -22,11 +23,18 @@ SILENCE_THRESHOLD = 150  # RMS threshold for silence (lowered to capture quiet s
 SILENCE_DURATION = 1.2   # Seconds of silence before stopping
 MAX_RECORDING_TIME = 10  # Maximum recording time in seconds
 
+# Reused across chunks so the hot loop doesn't allocate per read
+rms_scratch = np.empty(CHUNK, dtype=np.float32)
+
 def get_rms(data):
     """Calculate RMS (Root Mean Square) of audio data"""
-    audio_data = np.frombuffer(data, dtype=np.int16).astype(np.float32)
-    rms = np.sqrt(np.mean(audio_data**2))
-    return rms if not np.isnan(rms) else 0.0
+    audio_data = np.frombuffer(data, dtype=np.int16)
+    if audio_data.size == 0:
+        return 0.0
+    # Contiguous float32 copy so np.dot dispatches to the SIMD BLAS sdot kernel
+    samples = rms_scratch[:audio_data.size]
+    np.copyto(samples, audio_data)
+    return math.sqrt(float(np.dot(samples, samples)) / audio_data.size)
 
 # Get microphone index from command line or use default
 mic_index = int(sys.argv[1]) if len(sys.argv) > 1 else None
@@ -45,30 +53,27 @@ if mic_index is not None:
 
 stream = audio.open(**stream_kwargs)
 
-from collections import deque
-
-# Pre-buffer to capture audio before speech detection
-PRE_BUFFER_DURATION = 1.0  # seconds of audio to keep before detection
-pre_buffer_size = int(PRE_BUFFER_DURATION * RATE / CHUNK)
-pre_buffer = deque(maxlen=pre_buffer_size)
+# Stream chunks straight to the WAV file instead of buffering the recording
+wf = wave.open(OUTPUT_FILE, 'wb')
+wf.setnchannels(CHANNELS)
+wf.setsampwidth(audio.get_sample_size(pyaudio.paInt16))
+wf.setframerate(RATE)
 
-frames = []
 silent_chunks = 0
 silence_chunks_needed = int(SILENCE_DURATION * RATE / CHUNK)
 max_chunks = int(MAX_RECORDING_TIME * RATE / CHUNK)
 chunk_count = 0
 
-print(f"DEBUG: Recording immediately with {PRE_BUFFER_DURATION}s pre-buffer, Silence duration={SILENCE_DURATION}s", flush=True)
+print(f"DEBUG: Recording immediately, Silence duration={SILENCE_DURATION}s", flush=True)
 
-# Start recording immediately, add pre-buffer
-frames.extend(list(pre_buffer))
+# Start recording immediately
 recording_started = True
 
 # Record until silence detected or max time reached
 while chunk_count < max_chunks:
     data = stream.read(CHUNK, exception_on_overflow=False)
     chunk_count += 1
-    frames.append(data)
+    wf.writeframes(data)
 
     rms = get_rms(data)
 
@@ -91,12 +96,6 @@ if chunk_count >= max_chunks:
 stream.stop_stream()
 stream.close()
 audio.terminate()
-
-wf = wave.open(OUTPUT_FILE, 'wb')
-wf.setnchannels(CHANNELS)
-wf.setsampwidth(audio.get_sample_size(pyaudio.paInt16))
-wf.setframerate(RATE)
-wf.writeframes(b''.join(frames))
 wf.close()
 
 print("DONE", flush=True)
@@ -4,29 +4,29 @@ Real-time wake word detection - outputs DETECTED when Jarvis is heard
 """
 
 import numpy as np
-import librosa
 import pyaudio
 import json
-import tensorflow as tf
-from collections import deque
 import sys
-
-# Load model
-# Load without compiling - we don't need the loss function for inference
-model = tf.keras.models.load_model("jarvis_model/model.h5", compile=False)
+from wakeword_features import SAMPLE_RATE, RingBuffer, WakeWordModel, extract_features, is_silent
 
 with open("jarvis_model/metadata.json", "r") as f:
     metadata = json.load(f)
 
+# Load the int8 TFLite model exported by 2_train_model.py (with its
+# feature normalization from the metadata)
+wake_model = WakeWordModel("jarvis_model/model.tflite", metadata)
+
 MAX_FRAMES = metadata["max_frames"]
 N_MFCC = metadata["n_mfcc"]
-SAMPLE_RATE = 16000
+USE_DELTAS = metadata.get("use_deltas", False)
 
 # Audio
 CHUNK = 1024
 BUFFER_DURATION = 0.8  # Fast detection for quick "Jarvis"
 buffer_size = int(SAMPLE_RATE * BUFFER_DURATION)
-audio_buffer = deque(maxlen=buffer_size)
+
+# Rolling window as a preallocated int16 ring buffer
+audio_buffer = RingBuffer(buffer_size)
 
 # Get microphone index from command line or use default
 mic_index = int(sys.argv[1]) if len(sys.argv) > 1 else None
@@ -47,24 +47,6 @@ stream = p.open(**stream_kwargs)
 
 print("READY", flush=True)
 
-def is_silent(audio_data, threshold=0.01):
-    """Check if audio is too quiet to be speech"""
-    audio = np.array(audio_data, dtype=np.float32) / 32768.0
-    rms = np.sqrt(np.mean(audio**2))
-    return rms < threshold
-
-def extract_features(audio_data):
-    audio = np.array(audio_data, dtype=np.float32) / 32768.0
-    mfcc = librosa.feature.mfcc(y=audio, sr=SAMPLE_RATE, n_mfcc=N_MFCC, hop_length=256)
-
-    if mfcc.shape[1] < MAX_FRAMES:
-        pad_width = MAX_FRAMES - mfcc.shape[1]
-        mfcc = np.pad(mfcc, ((0, 0), (0, pad_width)), mode='constant')
-    else:
-        mfcc = mfcc[:, :MAX_FRAMES]
-
-    return mfcc.T
-
 frame_count = 0
 cooldown_frames = 0  # Cooldown to prevent duplicate detections
 
@@ -72,24 +54,23 @@ try:
     while True:
         data = stream.read(CHUNK, exception_on_overflow=False)
         audio_chunk = np.frombuffer(data, dtype=np.int16)
-        audio_buffer.extend(audio_chunk)
+        audio_buffer.write(audio_chunk)
 
         # Decrease cooldown
         if cooldown_frames > 0:
             cooldown_frames -= 1
 
         frame_count += 1
-        if frame_count >= 5 and len(audio_buffer) >= buffer_size and cooldown_frames == 0:
+        if frame_count >= 5 and audio_buffer.full and cooldown_frames == 0:
             frame_count = 0
 
             # Skip if audio is too quiet (silence detection)
-            if is_silent(list(audio_buffer)):
+            if is_silent(audio_buffer.energy, buffer_size):
                 continue
 
-            features = extract_features(list(audio_buffer))
-            features = np.expand_dims(features, axis=0)
-
-            prediction = model.predict(features, verbose=0)[0][0]
+            audio = audio_buffer.window().astype(np.float32) / 32768.0
+            # Same features as training, including deltas when the model uses them
+            prediction = wake_model(extract_features(audio, N_MFCC, MAX_FRAMES, USE_DELTAS))
 
             if prediction > 0.8:
                 print(f"DETECTED:{prediction:.3f}", flush=True)
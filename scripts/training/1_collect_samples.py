@@ -40,29 +40,37 @@ def get_microphone_index():
 MIC_DEVICE_INDEX = get_microphone_index()
 
 def get_next_number(directory):
-    """Find the next available number for this type"""
-    existing = [f for f in os.listdir(directory) if f.endswith('.wav')]
-    if not existing:
-        return 1
+    """Find the next available number for this type (scans the directory once)"""
     numbers = []
-    for f in existing:
-        try:
-            num = int(f.split('_')[1].split('.')[0])
-            numbers.append(num)
-        except:
-            pass
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.wav'):
+                continue
+            try:
+                numbers.append(int(entry.name.split('_')[1].split('.')[0]))
+            except (IndexError, ValueError):
+                pass
     return max(numbers) + 1 if numbers else 1
 
 # Get microphone capabilities and configure
-p = pyaudio.PyAudio()
-mic_info = p.get_device_info_by_index(MIC_DEVICE_INDEX)
+audio = pyaudio.PyAudio()
+mic_info = audio.get_device_info_by_index(MIC_DEVICE_INDEX)
 mic_name = mic_info['name']
 
 # Use the mic's native sample rate and channels
 RATE = int(mic_info['defaultSampleRate'])
 CHANNELS = min(1, int(mic_info['maxInputChannels']))  # Prefer mono, but use what's available
 
-p.terminate()
+# Open the stream once for the whole session; it's only started while recording
+stream = audio.open(
+    format=pyaudio.paInt16,
+    channels=CHANNELS,
+    rate=RATE,
+    input=True,
+    input_device_index=MIC_DEVICE_INDEX,
+    frames_per_buffer=CHUNK,
+    start=False
+)
 
 print("🎙️  Training Data Collection - Interactive Mode")
 print("=" * 50)
@@ -74,31 +82,27 @@ print("Each recording is 1 second\n")
 def record_sample(filename, prompt):
     print(f"{prompt} - 🔴 RECORDING!", end=" ", flush=True)
 
-    audio = pyaudio.PyAudio()
-    stream = audio.open(
-        format=pyaudio.paInt16,
-        channels=CHANNELS,
-        rate=RATE,
-        input=True,
-        input_device_index=MIC_DEVICE_INDEX,
-        frames_per_buffer=CHUNK
-    )
-
-    frames = []
-    for _ in range(0, int(RATE / CHUNK * RECORD_SECONDS)):
-        data = stream.read(CHUNK)
-        frames.append(data)
-
-    stream.stop_stream()
-    stream.close()
-    audio.terminate()
-
-    # Save
+    stream.start_stream()
+
+    # Write each chunk as it arrives rather than joining them at the end
     wf = wave.open(filename, 'wb')
     wf.setnchannels(CHANNELS)
     wf.setsampwidth(audio.get_sample_size(pyaudio.paInt16))
     wf.setframerate(RATE)
-    wf.writeframes(b''.join(frames))
+
+    try:
+        for _ in range(0, int(RATE / CHUNK * RECORD_SECONDS)):
+            data = stream.read(CHUNK)
+            wf.writeframes(data)
+    except KeyboardInterrupt:
+        # Don't leave a truncated sample in the training data
+        wf.close()
+        os.remove(filename)
+        raise
+    finally:
+        # Stop between samples so audio doesn't pile up in the input buffer
+        stream.stop_stream()
+
     wf.close()
 
     print("✅")
@@ -131,20 +135,26 @@ print("Get ready! Recording starts in 2 seconds...\n")
 import time
 time.sleep(2)
 
+# Scan once, then count in memory instead of re-listing per sample
+next_num = get_next_number(directory)
+
 try:
     for i in range(sample_count):
-        num = get_next_number(directory)
-        filename = f"{directory}/{prefix}_{num}.wav"
+        filename = f"{directory}/{prefix}_{next_num}.wav"
         record_sample(filename, f"[{i+1}/{sample_count}]")
+        next_num += 1
         time.sleep(0.3)  # Brief pause between recordings
 
-    total = get_next_number(directory) - 1
+    total = next_num - 1
     print(f"\n\n✅ Done! Recorded {sample_count} samples")
     print(f"Total {prefix} samples: {total}")
     print("\nNext: Train the model")
     print("  bun run train\n")
 except KeyboardInterrupt:
-    total = get_next_number(directory) - 1
+    total = next_num - 1
     print(f"\n\n✅ Stopped early. Total {prefix} samples: {total}")
     print("\nNext: Train the model")
     print("  bun run train\n")
+
+stream.close()
+audio.terminate()
@@ -4,56 +4,138 @@ Step 2: Train the Wake Word Model using Python
 """
 
 import numpy as np
-import librosa
 import os
+import sys
 import json
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
 from pathlib import Path
-import tensorflow as tf
-from tensorflow import keras
-from sklearn.model_selection import train_test_split
-from sklearn.utils.class_weight import compute_class_weight
-from sklearn.metrics import precision_score, recall_score, f1_score
-from scipy.ndimage import gaussian_filter1d
-
-print("🚀 FAST MODE - Training Jarvis Wake Word Model")
-print("=" * 70)
-print("⚡ This will take 2-5 minutes and achieve 85-92% accuracy")
-print("=" * 70)
+
+# Feature constants and helpers shared with 3_test_model.py and the detectors
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from wakeword_features import (
+    SAMPLE_RATE, N_FFT, HOP_LENGTH, N_MELS, TOP_DB, FFT_WINDOW, MEL_BASIS, dct_basis, deltas, fit_frames,
+)
+from audio_io import DURATION, load_audio
+
+# TensorFlow is imported inside the functions that use it, not here: decode
+# workers re-import this script when processes are spawned (the macOS
+# default) just to reach audio_io.load_audio, and shouldn't each load TF
 
 # Parameters - EXTREME PERFORMANCE MODE
-SAMPLE_RATE = 16000
-DURATION = 1.5
 N_MFCC = 40  # Much higher for extreme detail (20 -> 40)
 USE_DELTAS = True  # Add delta and delta-delta features
 USE_DELTA_DELTA = True  # Triple features (MFCC + delta + delta-delta)
 MAX_FRAMES = 94  # ~1.5 seconds with hop_length=256
-
-def extract_features(file_path):
-    """Extract MFCC features with deltas from audio file"""
-    try:
-        audio, sr = librosa.load(file_path, sr=SAMPLE_RATE, duration=DURATION)
-
-        # Extract MFCC features
-        mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=N_MFCC, hop_length=256)
-
-        if USE_DELTAS:
-            # Add delta (velocity) and delta-delta (acceleration) features
-            delta = librosa.feature.delta(mfcc)
-            delta2 = librosa.feature.delta(mfcc, order=2)
-            # Combine all features: MFCC + delta + delta-delta
-            mfcc = np.vstack([mfcc, delta, delta2])
-
-        # Pad or truncate to fixed length
-        if mfcc.shape[1] < MAX_FRAMES:
-            pad_width = MAX_FRAMES - mfcc.shape[1]
-            mfcc = np.pad(mfcc, ((0, 0), (0, pad_width)), mode='constant')
-        else:
-            mfcc = mfcc[:, :MAX_FRAMES]
-
-        return mfcc.T  # Transpose to (time_steps, features)
-    except Exception as e:
-        print(f"  ⚠️  Error processing {file_path}: {e}")
-        return None
+# If using deltas, feature dimension is N_MFCC * 3 (MFCC + delta + delta-delta)
+FEATURE_DIM = N_MFCC * 3 if USE_DELTAS else N_MFCC
+
+MAX_SAMPLES = int(SAMPLE_RATE * DURATION)
+FEATURE_BATCH_SIZE = 128  # Files per batched MFCC call (bounds STFT memory)
+# Stored features (RAM, cache, training tensors) are float16 - ~3 significant
+# digits is plenty for MFCCs; batches are cast back to float32 on the fly
+FEATURE_DTYPE = np.float16
+
+DCT_BASIS = dct_basis(N_MFCC)
+
+def batch_mfcc(audio, n_frames):
+    """
+    MFCCs for a zero-padded (batch, MAX_SAMPLES) audio batch in one graph.
+    Matches librosa.feature.mfcc on each unpadded clip for its first n_frames
+    frames (centered STFT, power_to_db with top_db=80, orthonormal DCT-II).
+    Returns (batch, frames, N_MFCC).
+    """
+    import tensorflow as tf
+    padded = tf.pad(audio, [[0, 0], [N_FFT // 2, N_FFT // 2]])
+    frames = tf.signal.frame(padded, N_FFT, HOP_LENGTH)
+    power = tf.square(tf.abs(tf.signal.rfft(frames * FFT_WINDOW)))
+
+    mel = tf.matmul(power, MEL_BASIS, transpose_b=True)
+    log_mel = 10.0 * tf.math.log(tf.maximum(mel, 1e-10)) / np.log(10.0)
+
+    # top_db clamp against each clip's own peak, ignoring the padded frames
+    valid = tf.sequence_mask(n_frames, tf.shape(log_mel)[1])[:, :, None]
+    peak = tf.reduce_max(tf.where(valid, log_mel, -np.inf), axis=[1, 2], keepdims=True)
+    log_mel = tf.maximum(log_mel, peak - TOP_DB)
+
+    return tf.matmul(log_mel, DCT_BASIS, transpose_b=True)
+
+@cache
+def batch_mfcc_graph():
+    """batch_mfcc as one tf.function with a fixed signature, traced on first use"""
+    import tensorflow as tf
+    return tf.function(batch_mfcc, input_signature=[
+        tf.TensorSpec((None, MAX_SAMPLES), tf.float32),
+        tf.TensorSpec((None,), tf.int32),
+    ])
+
+def extract_features(file_paths, padded, lengths):
+    """Extract MFCC features with deltas for a batch of zero-padded clips"""
+    n_frames = (1 + lengths // HOP_LENGTH).astype(np.int32)
+
+    mfccs = batch_mfcc_graph()(padded, n_frames).numpy()
+
+    features = []
+    for file_path, mfcc, n in zip(file_paths, mfccs, n_frames):
+        try:
+            # (time_steps, n_mfcc) for the unpadded clip
+            mfcc = mfcc[:n]
+
+            if USE_DELTAS:
+                # Add delta (velocity) and delta-delta (acceleration) features
+                # Combine all features: MFCC + delta + delta-delta
+                mfcc = np.hstack([mfcc, deltas(mfcc)])
+
+            # Pad or truncate to fixed length
+            features.append(fit_frames(mfcc, MAX_FRAMES))
+        except Exception as e:
+            print(f"  ⚠️  Error processing {file_path}: {e}")
+            features.append(None)
+    return features
+
+def cache_key(files, settings):
+    """Hash of the exact set of WAVs (path, label, mtime, size) and settings"""
+    key = hashlib.md5(repr(settings).encode())
+    for file, label in sorted(files):
+        stat = file.stat()
+        key.update(f"{file}:{label}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return key.hexdigest()
+
+def decoded_audio(files):
+    """
+    Every clip decoded, resampled and zero-padded into one (files, MAX_SAMPLES)
+    float32 memmap, plus each clip's length (-1 where decoding failed).
+    Built once per set of WAVs, so changing feature settings skips decoding.
+    """
+    key = cache_key(files, (SAMPLE_RATE, DURATION))
+    audio_path = Path(f"training_data/.audio_{key}.npy")
+    lengths_path = Path(f"training_data/.audio_{key}_lengths.npy")
+    if audio_path.exists() and lengths_path.exists():
+        return np.load(audio_path, mmap_mode='r'), np.load(lengths_path)
+
+    for stale in Path("training_data").glob(".audio_*.npy"):
+        stale.unlink()
+
+    # Written under a temporary name so an interrupted run leaves no cache
+    partial_path = audio_path.with_name(audio_path.stem + "_partial.npy")
+    audio = np.lib.format.open_memmap(partial_path, mode='w+', dtype=np.float32, shape=(len(files), MAX_SAMPLES))
+    lengths = np.full(len(files), -1, dtype=np.int64)
+
+    # Decoding and resampling is CPU-bound and independent per file - use every core
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        clips = executor.map(load_audio, [str(f) for f, _ in files], chunksize=8)
+        for i, clip in enumerate(clips):
+            if clip is not None:
+                audio[i, :len(clip)] = clip
+                lengths[i] = len(clip)
+
+    audio.flush()
+    del audio
+    np.save(lengths_path, lengths)
+    partial_path.rename(audio_path)
+    return np.load(audio_path, mmap_mode='r'), lengths
 
 def load_data():
     """Load training data"""
@@ -71,32 +153,46 @@ def load_data():
     print(f"  - {len(noise_files)} noise samples")
     print(f"  - {len(negative_files)} negative speech samples")
 
-    X = []
-    y = []
-
-    # Load positive samples (Jarvis)
-    for file in jarvis_files:
-        features = extract_features(str(file))
-        if features is not None:
-            X.append(features)
-            y.append(1)
-
-    # Load negative samples (noise + negative speech)
-    for file in noise_files:
-        features = extract_features(str(file))
-        if features is not None:
-            X.append(features)
-            y.append(0)
-    
-    # Load negative speech samples
-    for file in negative_files:
-        features = extract_features(str(file))
+    # Positive samples (Jarvis), then negatives (noise + negative speech)
+    files = [(f, 1) for f in jarvis_files] + [(f, 0) for f in noise_files + negative_files]
+
+    # Reuse features from a previous run if no WAV (or setting) has changed
+    cache_path = Path("training_data/.cache_{}.npz".format(cache_key(
+        files, (SAMPLE_RATE, DURATION, N_MFCC, USE_DELTAS, MAX_FRAMES, np.dtype(FEATURE_DTYPE).name))))
+    if cache_path.exists():
+        with np.load(cache_path) as cached:
+            X, y = cached["X"], cached["y"]
+        print(f"✅ Loaded {len(X)} samples from feature cache")
+        print(f"   Shape: {X.shape}\n")
+        return X, y
+
+    audio, lengths = decoded_audio(files)
+
+    # MFCCs are computed in batches through one TF graph (GPU when available)
+    results = [None] * len(files)
+    decoded = np.flatnonzero(lengths >= 0)
+    for start in range(0, len(decoded), FEATURE_BATCH_SIZE):
+        batch = decoded[start:start + FEATURE_BATCH_SIZE]
+        features = extract_features([str(files[i][0]) for i in batch], audio[batch], lengths[batch])
+        for i, feature in zip(batch, features):
+            results[i] = feature
+
+    # Write straight into preallocated arrays, packing past files that failed
+    X = np.empty((len(files), MAX_FRAMES, FEATURE_DIM), dtype=FEATURE_DTYPE)
+    y = np.empty(len(files), dtype=np.int64)
+    count = 0
+    for features, (_, label) in zip(results, files):
         if features is not None:
-            X.append(features)
-            y.append(0)
+            X[count] = features
+            y[count] = label
+            count += 1
+    # Views, not copies
+    X, y = X[:count], y[:count]
 
-    X = np.array(X)
-    y = np.array(y)
+    # Replace any stale cache from an older set of files
+    for stale in Path("training_data").glob(".cache_*.npz"):
+        stale.unlink()
+    np.savez(cache_path, X=X, y=y)
 
     print(f"✅ Loaded {len(X)} samples")
     print(f"   Shape: {X.shape}\n")
@@ -105,17 +201,23 @@ def load_data():
 
 def focal_loss(gamma=2.0, alpha=0.25):
     """Focal loss - focuses learning on hard examples and reduces false positives"""
+    import tensorflow as tf
+    from tensorflow import keras
+    # Purely elementwise (no tf.where) so XLA fuses the whole loss into one kernel
+    @tf.function(jit_compile=True)
     def focal_loss_fixed(y_true, y_pred):
         epsilon = keras.backend.epsilon()
-        y_pred = keras.backend.clip(y_pred, epsilon, 1.0 - epsilon)
-        p_t = tf.where(tf.equal(y_true, 1), y_pred, 1 - y_pred)
-        alpha_t = tf.where(tf.equal(y_true, 1), alpha, 1 - alpha)
+        y_true = tf.cast(y_true, y_pred.dtype)
+        y_pred = tf.clip_by_value(y_pred, epsilon, 1.0 - epsilon)
+        p_t = y_true * y_pred + (1 - y_true) * (1 - y_pred)
+        alpha_t = y_true * alpha + (1 - y_true) * (1 - alpha)
         focal_loss = -alpha_t * tf.pow((1 - p_t), gamma) * tf.math.log(p_t)
         return tf.reduce_mean(focal_loss)
     return focal_loss_fixed
 
 def attention_block(x):
     """Squeeze-and-Excitation attention mechanism"""
+    from tensorflow import keras
     # Global average pooling
     avg_pool = keras.layers.GlobalAveragePooling1D()(x)
     # Fully connected layers for channel attention
@@ -127,6 +229,7 @@ def attention_block(x):
 
 def residual_block(x, filters, kernel_size=3):
     """Residual CNN block with skip connection"""
+    from tensorflow import keras
     # Main path
     conv1 = keras.layers.Conv1D(filters, kernel_size, padding='same')(x)
     bn1 = keras.layers.BatchNormalization()(conv1)
@@ -143,12 +246,14 @@ def residual_block(x, filters, kernel_size=3):
     out = keras.layers.Activation('relu')(add)
     return out
 
-def create_model(input_shape):
-    """FAST MODE: Lightweight CNN+LSTM for quick training"""
+def create_model(input_shape, learning_rate=0.001):
+    """FAST MODE: Lightweight all-convolutional model for quick training"""
+    from tensorflow import keras
     inputs = keras.layers.Input(shape=input_shape)
 
-    # Simple CNN layers
-    x = keras.layers.Conv1D(64, 5, padding='same', activation='relu')(inputs)
+    # Simple CNN layers - the stem sees all FEATURE_DIM channels, so it is
+    # depthwise-separable (~1/5 of a full Conv1D's multiply-adds)
+    x = keras.layers.SeparableConv1D(64, 5, padding='same', activation='relu', depthwise_initializer='he_normal')(inputs)
     x = keras.layers.MaxPooling1D(2)(x)
     x = keras.layers.Dropout(0.2)(x)
 
@@ -156,102 +261,203 @@ def create_model(input_shape):
     x = keras.layers.MaxPooling1D(2)(x)
     x = keras.layers.Dropout(0.2)(x)
 
-    # Single LSTM layer
-    x = keras.layers.Bidirectional(keras.layers.LSTM(64, return_sequences=False))(x)
+    # Depthwise-separable convs instead of a BiLSTM - parallel over time
+    # rather than one recurrent step per frame
+    x = keras.layers.SeparableConv1D(128, 5, padding='same', activation='relu')(x)
+    x = keras.layers.SeparableConv1D(128, 5, padding='same', activation='relu')(x)
+    x = keras.layers.GlobalAveragePooling1D()(x)
     x = keras.layers.Dropout(0.3)(x)
 
     # Simple dense layers
     x = keras.layers.Dense(64, activation='relu')(x)
     x = keras.layers.Dropout(0.3)(x)
 
-    # Output layer
-    outputs = keras.layers.Dense(1, activation='sigmoid')(x)
+    # Output layer - kept in float32 so the loss is stable under mixed precision
+    outputs = keras.layers.Dense(1, activation='sigmoid', dtype='float32')(x)
 
     model = keras.Model(inputs=inputs, outputs=outputs)
 
-    # Simple binary crossentropy - much faster than focal loss
+    # Simple binary crossentropy - much faster than focal loss. Under
+    # mixed_float16, compile wraps the optimizer in a LossScaleOptimizer itself
     model.compile(
-        optimizer=keras.optimizers.Adam(learning_rate=0.001),
+        optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
         loss='binary_crossentropy',
         metrics=['accuracy', keras.metrics.Precision(name='precision'), keras.metrics.Recall(name='recall')]
     )
 
     return model
 
-def augment_data(X, y, augment_factor=5):
-    """EXTREME augmentation with multiple aggressive techniques"""
-    X_augmented = []
-    y_augmented = []
-
-    # Add original data
-    X_augmented.extend(X)
-    y_augmented.extend(y)
-
-    # Augment positive samples (Jarvis) VERY aggressively
-    for i in range(len(X)):
-        if y[i] == 1:  # Only augment Jarvis samples
-            for j in range(augment_factor):
-                # Apply multiple augmentation techniques simultaneously
-                augmented = X[i].copy()
-
-                # 1. Time shift (always apply with varying amounts)
-                shift = np.random.randint(-8, 9)
-                augmented = np.roll(augmented, shift, axis=0)
-
-                # 2. Add noise to features (70% of the time)
-                if np.random.random() > 0.3:
-                    noise_level = np.random.uniform(0.02, 0.08)
-                    noise = np.random.normal(0, noise_level, augmented.shape)
-                    augmented = augmented + noise
-
-                # 3. Scale features - more aggressive range (80% of the time)
-                if np.random.random() > 0.2:
-                    scale = np.random.uniform(0.7, 1.3)
-                    augmented = augmented * scale
-
-                # 4. Random masking - zero out random time steps (30% of the time)
-                if np.random.random() > 0.7:
-                    mask_length = np.random.randint(1, 4)
-                    mask_start = np.random.randint(0, augmented.shape[0] - mask_length)
-                    augmented[mask_start:mask_start+mask_length, :] *= 0.1
-
-                # 5. Gaussian blur along time axis (20% of the time)
-                if np.random.random() > 0.8:
-                    from scipy.ndimage import gaussian_filter1d
-                    sigma = np.random.uniform(0.5, 1.5)
-                    augmented = gaussian_filter1d(augmented, sigma=sigma, axis=0)
-
-                X_augmented.append(augmented)
-                y_augmented.append(1)
-
+def stratified_split(y, val_fraction=0.2, seed=42):
+    """Shuffled train/validation indices keeping each class's share of y"""
+    rng = np.random.default_rng(seed)
+    train_idx, val_idx = [], []
+    for label in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == label))
+        n_val = int(round(val_fraction * len(idx)))
+        val_idx.append(idx[:n_val])
+        train_idx.append(idx[n_val:])
+    # Sorted so the gathers read X front to back; tf.data shuffles later
+    return np.sort(np.concatenate(train_idx)), np.sort(np.concatenate(val_idx))
+
+def feature_stats(X, chunk_size=1024):
+    """
+    Per-feature mean and std over every frame of (samples, frames, features)
+    X, accumulated in float64 a chunk at a time so float16 X is never copied whole
+    """
+    total = np.zeros(X.shape[-1])
+    total_sq = np.zeros(X.shape[-1])
+    count = 0
+    for start in range(0, len(X), chunk_size):
+        block = X[start:start + chunk_size].reshape(-1, X.shape[-1]).astype(np.float64)
+        total += block.sum(axis=0)
+        total_sq += np.square(block).sum(axis=0)
+        count += len(block)
+    mean = total / count
+    std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+    # Floor keeps constant channels from blowing up
+    return mean.astype(np.float32), np.maximum(std, 1e-3).astype(np.float32)
+
+# Augmentation recipe of each element in an epoch; originals pass through
+ORIGINAL, AUGMENT_POSITIVE, AUGMENT_NEGATIVE = 0, 1, 2
+BLUR_RADIUS = int(4.0 * 1.5 + 0.5)  # scipy's 4-sigma truncation at the largest sigma
+
+def augmented_epoch(y, augment_factor=5):
+    """
+    (indices into the training set, augmentation mode) for one epoch: every
+    original sample, plus augment_factor copies of each positive and 2 of
+    each negative that augment_batch randomizes afresh every epoch
+    """
     # Augment negative samples more to improve robustness
     negative_augment_factor = 2  # Increased from 1
-    for i in range(len(X)):
-        if y[i] == 0:  # Augment negative samples
-            for _ in range(negative_augment_factor):
-                augmented = X[i].copy()
-                # Moderate augmentation for negatives
-                shift = np.random.randint(-5, 6)
-                augmented = np.roll(augmented, shift, axis=0)
-                if np.random.random() > 0.5:
-                    noise = np.random.normal(0, 0.03, augmented.shape)
-                    augmented = augmented + noise
-                X_augmented.append(augmented)
-                y_augmented.append(0)
-
-    return np.array(X_augmented), np.array(y_augmented)
+    positives = np.repeat(np.flatnonzero(y == 1), augment_factor)
+    negatives = np.repeat(np.flatnonzero(y == 0), negative_augment_factor)
+    indices = np.concatenate([np.arange(len(y)), positives, negatives])
+    modes = np.concatenate([
+        np.full(len(y), ORIGINAL),
+        np.full(len(positives), AUGMENT_POSITIVE),
+        np.full(len(negatives), AUGMENT_NEGATIVE),
+    ]).astype(np.int32)
+    return indices, modes
+
+def augment_batch(features, modes, seed):
+    """
+    EXTREME augmentation with multiple aggressive techniques, for a whole
+    batch in graph mode. Positives (Jarvis) get time shift, noise, scaling,
+    masking and blur; negatives a moderate shift and noise. Every random
+    draw is stateless and derived from seed.
+    """
+    import tensorflow as tf
+    seeds = tf.unstack(tf.random.experimental.stateless_split(seed, num=12))
+    batch_size = tf.shape(features)[0]
+    n_frames = features.shape[1]
+    x = tf.cast(features, tf.float32)
+    positive = tf.equal(modes, AUGMENT_POSITIVE)
+    negative = tf.equal(modes, AUGMENT_NEGATIVE)
+
+    def uniform(i, low=0.0, high=1.0):
+        return tf.random.stateless_uniform([batch_size], seeds[i], low, high)
+
+    # 1. Time shift - up to ±8 frames for positives, ±5 for negatives
+    max_shift = tf.where(positive, 8, tf.where(negative, 5, 0))
+    shifts = tf.cast(tf.floor(uniform(0) * tf.cast(2 * max_shift + 1, tf.float32)), tf.int32) - max_shift
+    steps = tf.range(n_frames)[None, :]
+    x = tf.gather(x, (steps - shifts[:, None]) % n_frames, batch_dims=1)
+
+    # 2. Add noise to features (70% of positives, 50% of negatives)
+    noise_levels = tf.where(positive & (uniform(1) > 0.3), uniform(2, 0.02, 0.08), 0.0)
+    noise_levels = tf.where(negative & (uniform(3) > 0.5), 0.03, noise_levels)
+    x += tf.random.stateless_normal(tf.shape(x), seeds[4]) * noise_levels[:, None, None]
+
+    # 3. Scale features - more aggressive range (80% of positives)
+    scales = tf.where(positive & (uniform(5) > 0.2), uniform(6, 0.7, 1.3), 1.0)
+    x *= scales[:, None, None]
+
+    # 4. Random masking - damp 1-3 random time steps (30% of positives)
+    masked = positive & (uniform(7) > 0.7)
+    mask_lengths = 1 + tf.cast(tf.floor(uniform(8) * 3.0), tf.int32)
+    mask_starts = tf.cast(tf.floor(uniform(9) * tf.cast(n_frames - mask_lengths, tf.float32)), tf.int32)
+    time_mask = masked[:, None] & (steps >= mask_starts[:, None]) & (steps < (mask_starts + mask_lengths)[:, None])
+    x *= tf.where(time_mask, 0.1, 1.0)[:, :, None]
+
+    # 5. Gaussian blur along time axis (20% of positives) - scipy's
+    # gaussian_filter1d kernel per sample, zero-padded to the widest radius
+    blurred = positive & (uniform(10) > 0.8)
+    sigmas = uniform(11, 0.5, 1.5)
+    offsets = tf.range(-BLUR_RADIUS, BLUR_RADIUS + 1, dtype=tf.float32)[None, :]
+    kernels = tf.exp(-0.5 * tf.square(offsets / sigmas[:, None]))
+    kernels *= tf.cast(tf.abs(offsets) <= tf.floor(4.0 * sigmas + 0.5)[:, None], tf.float32)
+    kernels /= tf.reduce_sum(kernels, axis=1, keepdims=True)
+    padded = tf.pad(x, [[0, 0], [BLUR_RADIUS, BLUR_RADIUS], [0, 0]], mode='SYMMETRIC')
+    windows = tf.signal.frame(padded, 2 * BLUR_RADIUS + 1, 1, axis=1)
+    x = tf.where(blurred[:, None, None], tf.einsum('btkf,bk->btf', windows, kernels), x)
+
+    return x
+
+def export_tflite(model, calibration_features, saved_model_dir="jarvis_model/saved_model", path="jarvis_model/model.tflite"):
+    """Export a SavedModel and its int8 TFLite conversion for the real-time detector"""
+    import tensorflow as tf
+    from tensorflow import keras
+    # A model trained under a mixed policy has float16/bfloat16 ops that the
+    # int8 converter rejects - export a float32 copy with the same weights
+    policy = keras.mixed_precision.global_policy()
+    keras.mixed_precision.set_global_policy('float32')
+    try:
+        float_model = create_model(input_shape=model.input_shape[1:])
+    finally:
+        keras.mixed_precision.set_global_policy(policy)
+    float_model.set_weights(model.get_weights())
+
+    # Batch-1 signature: the detector runs one window at a time, so the
+    # converted graph can use static shapes throughout
+    float_model.export(saved_model_dir, input_signature=[tf.TensorSpec((1, MAX_FRAMES, FEATURE_DIM), tf.float32)])
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    # Full-integer quantization: int8 weights and activations, with ranges
+    # calibrated on real feature windows. The input is int8 too - detectors
+    # quantize MFCCs with the input tensor's scale/zero point - while the
+    # output stays a float32 probability
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    # X_val is sorted positives-first, so calibrate on 200 windows drawn from
+    # all of it - the first 200 would leave negative/silence ranges clipped
+    calibration_idx = np.sort(np.random.default_rng(0).choice(
+        len(calibration_features), min(len(calibration_features), 200), replace=False))
+    converter.representative_dataset = lambda: (
+        [calibration_features[i:i + 1].astype(np.float32)] for i in calibration_idx
+    )
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    tflite_model = converter.convert()
+    with open(path, "wb") as f:
+        f.write(tflite_model)
 
 def main():
+    import tensorflow as tf
+    from tensorflow import keras
+    from sklearn.metrics import f1_score
+
+    parser = argparse.ArgumentParser(description="Train the Jarvis wake word model")
+    parser.add_argument("--seed", type=int, help="seed weight init, dropout, shuffling and augmentation")
+    args = parser.parse_args()
+    seed = args.seed
+    if seed is not None:
+        # Python, NumPy and TF random state - covers weight initialization
+        # and dropout; the input pipeline takes the seed explicitly below
+        keras.utils.set_random_seed(seed)
+        # Also pin op implementations (GPU kernels, cross-replica reductions)
+        # to deterministic ones - slower, but the same seed gives the same model
+        tf.config.experimental.enable_op_determinism()
+
+    print("🚀 FAST MODE - Training Jarvis Wake Word Model")
+    print("=" * 70)
+    print("⚡ This will take 2-5 minutes and achieve 85-92% accuracy")
+    print("=" * 70)
+
     # Load data
     X, y = load_data()
 
     # Calculate class weights - penalize false positives more heavily
     # Increase weight for negatives to make model more conservative
-    class_weights = compute_class_weight(
-        'balanced',
-        classes=np.unique(y),
-        y=y
-    )
+    # 'balanced' weighting: n_samples / (n_classes * class_count)
+    class_weights = len(y) / (2.0 * np.bincount(y, minlength=2))
     # Boost negative class weight to reduce false positives
     # This makes the model more conservative - harder to trigger
     # Reduced from 1.5 to 1.2 to balance precision/recall better
@@ -266,9 +472,15 @@ def main():
     print(f"   Positive (Jarvis): {class_weight_dict[1]:.3f}\n")
 
     # Split into train/validation
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    train_idx, val_idx = stratified_split(y, val_fraction=0.2)
+    X_train, X_val, y_train, y_val = X[train_idx], X[val_idx], y[train_idx], y[val_idx]
+
+    # Standardize every feature channel: MFCC c0 spans hundreds of units while
+    # the deltas are about ±1, so under the int8 model input's single scale
+    # most delta values would round to zero. The stats go in metadata.json
+    # and the detectors apply them before quantizing (WakeWordModel)
+    feature_mean, feature_std = feature_stats(X_train)
+    X_val = ((X_val - feature_mean) / feature_std).astype(FEATURE_DTYPE)
 
     print(f"📊 Training set: {len(X_train)} samples")
     print(f"📊 Validation set: {len(X_val)} samples")
@@ -278,17 +490,30 @@ def main():
         def __init__(self, filepath, X_val, y_val, patience=20):
             super().__init__()
             self.filepath = filepath
-            self.X_val = X_val
+            # Converted once; every epoch reads the same device tensor
+            self.X_val = tf.convert_to_tensor(X_val.astype(np.float32))
             self.y_val = y_val
             self.patience = patience
             self.best_f1 = float('-inf')
             self.wait = 0
             self.best_weights = None
-            
+
+        def on_train_begin(self, logs=None):
+            # Traced once for the whole run - model.predict rebuilds its
+            # dataset and predict loop on every call
+            self.predict_fn = tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[tf.TensorSpec((None, MAX_FRAMES, FEATURE_DIM), tf.float32)],
+            )
+
         def on_epoch_end(self, epoch, logs=None):
             logs = logs or {}
             # Calculate F1 score
-            val_pred = (self.model.predict(self.X_val, verbose=0) > 0.5).astype(int).flatten()
+            probs = np.concatenate([
+                self.predict_fn(self.X_val[i:i + 256]).numpy()
+                for i in range(0, len(self.y_val), 256)
+            ])
+            val_pred = (probs > 0.5).astype(int).flatten()
             val_f1 = f1_score(self.y_val, val_pred, zero_division=0)
             logs['val_f1'] = val_f1
             
@@ -310,16 +535,34 @@ def main():
                     self.model.set_weights(self.best_weights)
                     print(f"   Restored weights from best F1 score: {self.best_f1:.4f}")
 
-    # Augment training data - FAST MODE (minimal augmentation)
-    print("\n🔄 Augmenting training data (FAST MODE)...")
-    X_train_aug, y_train_aug = augment_data(X_train, y_train, augment_factor=2)  # Minimal augmentation
-    print(f"   After augmentation: {len(X_train_aug)} samples\n")
+    # Augment training data - FAST MODE (minimal augmentation). Augmented
+    # copies are generated per batch inside the input pipeline, fresh each epoch
+    train_indices, train_modes = augmented_epoch(y_train, augment_factor=2)  # Minimal augmentation
+    print(f"\n🔄 Augmenting training data on the fly (FAST MODE): {len(train_indices)} samples per epoch\n")
+
+    # Mixed precision halves activation traffic on GPUs; CPU float16 is slower.
+    # Ampere (compute capability 8.0) and newer have bfloat16 Tensor Cores.
+    # export_tflite converts a float32 copy, so either policy exports to int8
+    gpus = tf.config.list_physical_devices('GPU')
+    if gpus:
+        capability = tf.config.experimental.get_device_details(gpus[0]).get('compute_capability', (0, 0))
+        policy = 'mixed_bfloat16' if capability >= (8, 0) else 'mixed_float16'
+        keras.mixed_precision.set_global_policy(policy)
+        print(f"⚡ Mixed precision enabled ({policy})")
+
+    # Replicate the model on every local GPU when there are several; the
+    # default strategy is a pass-through on a single GPU or CPU
+    strategy = tf.distribute.MirroredStrategy() if len(gpus) > 1 else tf.distribute.get_strategy()
+    if strategy.num_replicas_in_sync > 1:
+        print(f"⚡ Training on {strategy.num_replicas_in_sync} GPUs (MirroredStrategy)")
 
     # Create model
     print("🏗️  Building model...")
-    # If using deltas, feature dimension is N_MFCC * 3 (MFCC + delta + delta-delta)
-    feature_dim = N_MFCC * 3 if USE_DELTAS else N_MFCC
-    model = create_model(input_shape=(MAX_FRAMES, feature_dim))
+    # Larger batches amortize per-step overhead; LR scales linearly with them.
+    # The batch is global - each replica gets 128 samples of it
+    batch_size = 128 * strategy.num_replicas_in_sync
+    with strategy.scope():
+        model = create_model(input_shape=(MAX_FRAMES, FEATURE_DIM), learning_rate=0.001 * batch_size / 64)
     model.summary()
 
     # Train
@@ -328,13 +571,56 @@ def main():
     # Create F1 checkpoint callback
     f1_checkpoint = F1Checkpoint('jarvis_model/best_model.h5', X_val, y_val, patience=8)  # Low patience
 
+    # Input pipeline: shuffle, augment and batch in tf.data and prefetch so it overlaps training
+    options = tf.data.Options()
+    # Unseeded runs let parallel stages emit batches as soon as they're ready;
+    # seeded runs keep batch order fixed so the same seed sees the same batches
+    options.deterministic = seed is not None
+    options.threading.private_threadpool_size = os.cpu_count()
+
+    # Per-sample class weights precomputed once and sliced along with the indices
+    train_labels = y_train[train_indices]
+    sample_weights = np.where(train_labels == 1, class_weight_dict[1], class_weight_dict[0]).astype(np.float32)
+
+    # Features stay in memory once; batches gather and augment from them.
+    # Augmentation works on raw features, standardized afterwards
+    train_features = tf.constant(X_train)
+
+    def augment(batch, seed):
+        indices, modes, labels, weights = batch
+        features = augment_batch(tf.gather(train_features, indices), modes, seed)
+        return (features - feature_mean) / feature_std, labels, weights
+
+    def to_float32(features, labels):
+        return tf.cast(features, tf.float32), labels
+
+    batches = (
+        tf.data.Dataset.from_tensor_slices((train_indices, train_modes, train_labels.astype(np.float32), sample_weights))
+        .shuffle(len(train_indices), seed=seed, reshuffle_each_iteration=True)
+        .batch(batch_size)
+    )
+    # One stateless seed pair per batch, different every epoch
+    batch_seeds = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True).batch(2)
+    train_ds = (
+        tf.data.Dataset.zip((batches, batch_seeds))
+        .map(augment, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+        .with_options(options)
+    )
+    val_ds = (
+        tf.data.Dataset.from_tensor_slices((X_val, y_val.astype(np.float32)))
+        .batch(batch_size)
+        .map(to_float32)
+        .cache()
+        .prefetch(tf.data.AUTOTUNE)
+        .with_options(options)
+    )
+
     # FAST TRAINING - prioritize speed
     history = model.fit(
-        X_train_aug, y_train_aug,
-        validation_data=(X_val, y_val),
+        train_ds,
+        validation_data=val_ds,
         epochs=50,  # Much fewer epochs
-        batch_size=64,  # Larger batches for speed
-        class_weight=class_weight_dict,
         callbacks=[
             keras.callbacks.EarlyStopping(
                 monitor='val_loss',
@@ -360,25 +646,14 @@ def main():
 
     # Evaluate
     print("\n📊 Final Results:")
-    train_metrics = model.evaluate(X_train, y_train, verbose=0)
-    val_metrics = model.evaluate(X_val, y_val, verbose=0)
-    
-    # Handle different return formats
-    if len(train_metrics) == 4:
-        train_loss, train_acc, train_prec, train_rec = train_metrics
-        val_loss, val_acc, val_prec, val_rec = val_metrics
-    else:
-        train_loss, train_acc = train_metrics
-        val_loss, val_acc = val_metrics
-        # Calculate precision and recall manually
-        train_pred = (model.predict(X_train, verbose=0) > 0.5).astype(int).flatten()
-        val_pred = (model.predict(X_val, verbose=0) > 0.5).astype(int).flatten()
-        train_prec = precision_score(y_train, train_pred, zero_division=0)
-        train_rec = recall_score(y_train, train_pred, zero_division=0)
-        val_prec = precision_score(y_val, val_pred, zero_division=0)
-        val_rec = recall_score(y_val, val_pred, zero_division=0)
-
-    print(f"  Training:")
+    # Training metrics come from the last epoch's running values (on the
+    # augmented set) - another full pass over X_train would only repeat them
+    train_acc = history.history['accuracy'][-1]
+    train_prec = history.history['precision'][-1]
+    train_rec = history.history['recall'][-1]
+    val_loss, val_acc, val_prec, val_rec = model.evaluate(X_val, y_val, verbose=0)
+
+    print(f"  Training (last epoch):")
     print(f"    Accuracy: {train_acc:.2%}")
     print(f"    Precision: {train_prec:.2%}")
     print(f"    Recall: {train_rec:.2%}")
@@ -391,6 +666,7 @@ def main():
     print("\n💾 Saving model...")
     os.makedirs("jarvis_model", exist_ok=True)
     model.save("jarvis_model/model.h5")
+    export_tflite(model, X_val)
 
     # Save metadata
     metadata = {
@@ -398,6 +674,8 @@ def main():
         "n_mfcc": N_MFCC,
         "use_deltas": USE_DELTAS,
         "sample_rate": SAMPLE_RATE,
+        "feature_mean": feature_mean.tolist(),
+        "feature_std": feature_std.tolist(),
         "train_accuracy": float(train_acc),
         "val_accuracy": float(val_acc),
         "train_precision": float(train_prec),
@@ -409,7 +687,7 @@ def main():
     with open("jarvis_model/metadata.json", "w") as f:
         json.dump(metadata, f, indent=2)
 
-    print("✅ Model saved to jarvis_model/\n")
+    print("✅ Model saved to jarvis_model/ (model.h5 + int8 model.tflite)\n")
     print("Next step: Test the model")
     print("  bun 3_test_model.ts\n")
 
@@ -4,23 +4,31 @@ Step 3: Test the Model in Real-Time
 """
 
 import numpy as np
-import librosa
 import pyaudio
 import json
+import sys
+from pathlib import Path
 import tensorflow as tf
-from collections import deque
+
+# Feature constants, ring buffer and model I/O shared with training and the detectors
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from wakeword_features import (
+    N_FFT, HOP_LENGTH, TOP_DB, FFT_WINDOW, MEL_BASIS, DELTA_WIDTH, DELTA_KERNELS, RingBuffer, WakeWordModel, dct_basis,
+    is_silent,
+)
 
 print("🧪 Testing Jarvis Wake Word Model")
 print("=" * 50)
 
 # Load model and metadata
 print("\n📦 Loading model...")
-# Load without compiling - we don't need the loss function for inference
-model = tf.keras.models.load_model("jarvis_model/model.h5", compile=False)
-
 with open("jarvis_model/metadata.json", "r") as f:
     metadata = json.load(f)
 
+# int8 TFLite export of the trained model - one invoke per window, without
+# Keras' per-call predict overhead
+wake_model = WakeWordModel("jarvis_model/model.tflite", metadata)
+
 MAX_FRAMES = metadata["max_frames"]
 N_MFCC = metadata["n_mfcc"]
 USE_DELTAS = metadata.get("use_deltas", False)
@@ -36,8 +44,8 @@ CHANNELS = 1
 BUFFER_DURATION = 1.0  # seconds - increased from 0.8 for better detection
 buffer_size = int(SAMPLE_RATE * BUFFER_DURATION)
 
-# Audio buffer
-audio_buffer = deque(maxlen=buffer_size)
+# Audio buffer - fixed int16 ring, written in place
+audio_buffer = RingBuffer(buffer_size)
 
 # PyAudio
 p = pyaudio.PyAudio()
@@ -64,39 +72,43 @@ except OSError:
 
 print("Press Ctrl+C to stop\n")
 
-def is_silent(audio_data, threshold=0.01):
-    """Check if audio is too quiet to be speech"""
-    audio = np.array(audio_data, dtype=np.float32) / 32768.0
-    rms = np.sqrt(np.mean(audio**2))
-    return rms < threshold
-
+# The bases are fixed, so every detection window is a single TF graph call
+DCT_BASIS = dct_basis(N_MFCC)
+
+def savgol_deltas(mfcc):
+    """
+    librosa.feature.delta order 1 and 2 along frames as one (frames, 2 * n_mfcc)
+    [delta | delta-delta] tensor; the first and last 4 frames repeat the
+    nearest full window
+    """
+    edge = DELTA_WIDTH // 2
+    windows = tf.signal.frame(mfcc, DELTA_WIDTH, 1, axis=0)
+    both = tf.reshape(tf.einsum('wkf,kd->wdf', windows, DELTA_KERNELS), [tf.shape(windows)[0], -1])
+    return tf.concat([tf.repeat(both[:1], edge, axis=0), both, tf.repeat(both[-1:], edge, axis=0)], axis=0)
+
+@tf.function(input_signature=[tf.TensorSpec((None,), tf.int16)])
 def extract_features(audio_data):
-    """Extract MFCC with deltas from audio buffer"""
+    """Extract MFCC with deltas from audio buffer (same values as librosa, in one graph)"""
     # Convert to float32
-    audio = np.array(audio_data, dtype=np.float32) / 32768.0
-
-    # Extract MFCC
-    mfcc = librosa.feature.mfcc(
-        y=audio,
-        sr=SAMPLE_RATE,
-        n_mfcc=N_MFCC,
-        hop_length=256
-    )
+    audio = tf.cast(audio_data, tf.float32) / 32768.0
+
+    # Extract MFCC - centered STFT, power mel spectrogram, power_to_db, DCT-II
+    padded = tf.pad(audio, [[N_FFT // 2, N_FFT // 2]])
+    frames = tf.signal.frame(padded, N_FFT, HOP_LENGTH)
+    power = tf.square(tf.abs(tf.signal.rfft(frames * FFT_WINDOW)))
+    log_mel = 10.0 * tf.math.log(tf.maximum(tf.matmul(power, MEL_BASIS, transpose_b=True), 1e-10)) / np.log(10.0)
+    log_mel = tf.maximum(log_mel, tf.reduce_max(log_mel) - TOP_DB)
+    mfcc = tf.matmul(log_mel, DCT_BASIS, transpose_b=True)  # (time_steps, n_mfcc)
 
     if USE_DELTAS:
         # Add delta and delta-delta features to match training
-        delta = librosa.feature.delta(mfcc)
-        delta2 = librosa.feature.delta(mfcc, order=2)
-        mfcc = np.vstack([mfcc, delta, delta2])
+        mfcc = tf.concat([mfcc, savgol_deltas(mfcc)], axis=1)
 
     # Pad or truncate
-    if mfcc.shape[1] < MAX_FRAMES:
-        pad_width = MAX_FRAMES - mfcc.shape[1]
-        mfcc = np.pad(mfcc, ((0, 0), (0, pad_width)), mode='constant')
-    else:
-        mfcc = mfcc[:, :MAX_FRAMES]
+    mfcc = mfcc[:MAX_FRAMES]
+    mfcc = tf.pad(mfcc, [[0, MAX_FRAMES - tf.shape(mfcc)[0]], [0, 0]])
 
-    return mfcc.T
+    return mfcc[None]  # (1, time_steps, features)
 
 frame_count = 0
 cooldown_frames = 0  # Cooldown to prevent duplicate detections
@@ -108,7 +120,7 @@ try:
         audio_chunk = np.frombuffer(data, dtype=np.int16)
 
         # Add to buffer
-        audio_buffer.extend(audio_chunk)
+        audio_buffer.write(audio_chunk)
 
         # Decrease cooldown
         if cooldown_frames > 0:
@@ -116,19 +128,19 @@ try:
 
         # Check every 5 frames (~0.1 seconds) for faster response
         frame_count += 1
-        if frame_count >= 5 and len(audio_buffer) >= buffer_size and cooldown_frames == 0:
+        if frame_count >= 5 and audio_buffer.full and cooldown_frames == 0:
             frame_count = 0
+            window = audio_buffer.window()
 
             # Skip if audio is too quiet (silence detection)
-            if is_silent(list(audio_buffer)):
+            if is_silent(audio_buffer.energy, buffer_size):
                 continue
 
             # Extract features
-            features = extract_features(list(audio_buffer))
-            features = np.expand_dims(features, axis=0)
+            features = extract_features(window)
 
             # Predict
-            prediction = model.predict(features, verbose=0)[0][0]
+            prediction = wake_model(features.numpy()[0])
 
             # Adjusted thresholds - lower to be more sensitive
             if prediction > 0.75:
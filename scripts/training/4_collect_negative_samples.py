@@ -29,7 +29,9 @@ def get_next_file_number():
 
 def is_silent(audio_data, threshold=500):
     """Check if audio segment has sufficient energy"""
-    return np.max(np.abs(audio_data)) < threshold
+    # Two int16 compares instead of np.abs: no temporary array, and
+    # -32768 can't wrap around to a negative peak
+    return not (np.any(audio_data >= threshold) or np.any(audio_data <= -threshold))
 
 print("🎵 Negative Sample Collector")
 print("=" * 50)
@@ -64,7 +66,9 @@ except OSError:
     )
 
 file_num = get_next_file_number()
-frames = []
+# One segment of samples, filled chunk by chunk and reused for every segment
+frames_needed = int(SAMPLE_RATE / CHUNK * SEGMENT_DURATION)
+segment = np.empty(frames_needed * CHUNK, dtype=np.int16)
 frame_count = 0
 segments_saved = 0
 segments_skipped = 0
@@ -75,23 +79,19 @@ print("   Press Ctrl+C to stop\n")
 try:
     while True:
         data = stream.read(CHUNK, exception_on_overflow=False)
-        frames.append(data)
+        segment[frame_count * CHUNK:(frame_count + 1) * CHUNK] = np.frombuffer(data, dtype=np.int16)
         frame_count += 1
 
         # Every SEGMENT_DURATION seconds, save a file
-        frames_needed = int(SAMPLE_RATE / CHUNK * SEGMENT_DURATION)
         if frame_count >= frames_needed:
-            # Convert to numpy array to check if silent
-            audio_data = np.frombuffer(b''.join(frames), dtype=np.int16)
-
-            if not is_silent(audio_data):
-                # Save the segment
+            if not is_silent(segment):
+                # Save the segment - header plus a single write of the PCM
                 filename = f"training_data/negative/negative_{file_num:04d}.wav"
                 with wave.open(filename, 'wb') as wf:
                     wf.setnchannels(CHANNELS)
                     wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
                     wf.setframerate(SAMPLE_RATE)
-                    wf.writeframes(b''.join(frames))
+                    wf.writeframes(segment)
 
                 segments_saved += 1
                 print(f"✅ Saved segment #{file_num} (total: {segments_saved}, skipped: {segments_skipped})")
@@ -101,7 +101,6 @@ try:
                 print(f"⏭️  Skipped silent segment (total saved: {segments_saved}, skipped: {segments_skipped})")
 
             # Reset for next segment
-            frames = []
             frame_count = 0
 
 except KeyboardInterrupt:
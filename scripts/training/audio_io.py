@@ -0,0 +1,25 @@
+"""
+WAV decoding for training - kept free of TensorFlow so the decode worker
+processes 2_train_model.py starts stay lightweight
+"""
+
+import librosa
+import soundfile as sf
+from wakeword_features import SAMPLE_RATE
+
+DURATION = 1.5
+
+def load_audio(file_path):
+    """Load one WAV resampled to SAMPLE_RATE and cut to DURATION"""
+    try:
+        # Same result as librosa.load(sr=SAMPLE_RATE, duration=DURATION), but
+        # reads only the frames needed and resamples only when the rate differs
+        with sf.SoundFile(file_path) as f:
+            sr = f.samplerate
+            audio = f.read(int(DURATION * sr), dtype='float32', always_2d=True).mean(axis=1)
+        if sr != SAMPLE_RATE:
+            audio = librosa.resample(audio, orig_sr=sr, target_sr=SAMPLE_RATE)
+        return audio
+    except Exception as e:
+        print(f"  ⚠️  Error processing {file_path}: {e}")
+        return None
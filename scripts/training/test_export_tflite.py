@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test that export_tflite produces a valid int8 model even when the model was
+built under a mixed-precision policy (as training does on GPUs)
+
+Run: uvx --with tensorflow --with librosa --with scikit-learn --with soundfile python3 scripts/training/test_export_tflite.py
+"""
+
+import importlib.util
+import tempfile
+from pathlib import Path
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+# 2_train_model.py isn't an importable module name - load it by path
+spec = importlib.util.spec_from_file_location("train_model", Path(__file__).with_name("2_train_model.py"))
+train_model = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(train_model)
+
+def export_under_policy(policy):
+    """Build a model under policy, export it and return the loaded interpreter"""
+    keras.mixed_precision.set_global_policy(policy)
+    try:
+        model = train_model.create_model(input_shape=(train_model.MAX_FRAMES, train_model.FEATURE_DIM))
+        calibration = np.random.default_rng(0).normal(
+            size=(8, train_model.MAX_FRAMES, train_model.FEATURE_DIM)).astype(train_model.FEATURE_DTYPE)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.tflite"
+            train_model.export_tflite(model, calibration, saved_model_dir=str(Path(tmp) / "saved_model"), path=str(path))
+            # The caller's policy is left as it was
+            assert keras.mixed_precision.global_policy().name == policy
+            interpreter = tf.lite.Interpreter(model_content=path.read_bytes())
+    finally:
+        keras.mixed_precision.set_global_policy('float32')
+    interpreter.allocate_tensors()
+    return interpreter
+
+def check_int8_model(interpreter):
+    """int8 input of the training window shape, float32 probability out"""
+    input_details = interpreter.get_input_details()[0]
+    assert input_details['dtype'] == np.int8
+    assert tuple(input_details['shape']) == (1, train_model.MAX_FRAMES, train_model.FEATURE_DIM)
+    interpreter.set_tensor(input_details['index'], np.zeros(input_details['shape'], dtype=np.int8))
+    interpreter.invoke()
+    probability = interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+    assert probability.dtype == np.float32 and 0.0 <= probability[0, 0] <= 1.0
+
+def test_export_mixed_float16():
+    check_int8_model(export_under_policy('mixed_float16'))
+
+def test_export_mixed_bfloat16():
+    check_int8_model(export_under_policy('mixed_bfloat16'))
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
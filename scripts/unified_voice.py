@@ -4,18 +4,24 @@ Unified voice capture: wake word detection + recording with rolling buffer
 Captures 1.5 seconds BEFORE wake word for better transcription accuracy
 """
 
+import os
 import sys
 print("🐍 [Python] unified_voice.py starting...", flush=True)
 
 import numpy as np
 import librosa
+import scipy.fft
+import scipy.signal
 import pyaudio
 import json
 import wave
 import threading
-import select
+import queue
+import gc
+import traceback
 import torch
 from collections import deque
+from wakeword_features import FFT_WINDOW, RingBuffer, WakeWordModel, extract_features, is_silent, sum_of_squares
 
 print("🐍 [Python] Loading Silero VAD model...", flush=True)
 # Load Silero VAD - state-of-the-art speech detection
@@ -36,23 +42,30 @@ if always_listening:
     sys.argv.remove("--always-listening")
 
 # Load wake word model only if wake word detection is enabled
-model = None
+wake_model = None
 MAX_FRAMES = None
 N_MFCC = None
 USE_DELTAS = False
 
 if not no_wake_word:
-    import tensorflow as tf
-    # Load without compiling - we don't need the loss function for inference
-    model = tf.keras.models.load_model("jarvis_model/model.h5", compile=False)
-
+    # Int8 model exported by 2_train_model.py - converted at training time,
+    # not here, so startup stays fast. Older installs only have model.h5
+    if not os.path.exists("jarvis_model/model.tflite"):
+        print("🐍 [Python] FATAL: jarvis_model/model.tflite not found — re-run `bun run train` to export it", flush=True)
+        sys.exit(1)
     with open("jarvis_model/metadata.json", "r") as f:
         metadata = json.load(f)
 
+    # Shared by the detection and segment worker threads
+    wake_model = WakeWordModel("jarvis_model/model.tflite", metadata)
+
     MAX_FRAMES = metadata["max_frames"]
     N_MFCC = metadata["n_mfcc"]
     USE_DELTAS = metadata.get("use_deltas", False)
 
+    # Warm up the interpreter so delegate setup doesn't land on the first real detection
+    wake_model.warm_up()
+
 # Audio configuration
 RATE = 48000  # High quality for recording
 CHUNK = 1024
@@ -63,7 +76,30 @@ MAX_RECORDING_DURATION = 15.0  # Max 15s recording
 
 # Buffers
 pre_buffer_size = int(RATE * PRE_BUFFER_DURATION)
-pre_buffer = deque(maxlen=pre_buffer_size)
+# Rolling pre-buffer, with its running int16 sum of squares
+pre_buffer = RingBuffer(pre_buffer_size)
+
+# 48k -> 16k is an exact 3:1 decimation; build the polyphase anti-alias FIR
+# once (resample_poly's default Kaiser design) instead of on every window
+DECIMATION_FILTER = scipy.signal.firwin(61, 1 / 3, window=("kaiser", 5.0)).astype(np.float32)
+
+# STFT bin ranges for the speech and vibration sound checks (16 kHz,
+# n_fft=2048); the bands are fixed, so resolve the frequency masks to row
+# slices once
+SPECTRUM_FREQS = librosa.fft_frequencies(sr=16000, n_fft=2048)
+
+
+def frequency_band(low, high=np.inf):
+    """Rows of the STFT with low <= freq <= high"""
+    return slice(np.searchsorted(SPECTRUM_FREQS, low, side="left"),
+                 np.searchsorted(SPECTRUM_FREQS, high, side="right"))
+
+
+VIBRATION_BAND = frequency_band(40, 50)  # ~42Hz fundamental
+HARMONIC2_BAND = frequency_band(80, 100)
+HARMONIC3_BAND = frequency_band(120, 150)
+HIGH_FREQ_BAND = slice(np.searchsorted(SPECTRUM_FREQS, 200, side="right"), None)  # > 200Hz
+SPEECH_BAND = frequency_band(300, 3400)  # Formant range
 
 # VAD settings
 SILENCE_CHUNKS_THRESHOLD = int((SILENCE_DURATION * RATE) / CHUNK)
@@ -80,6 +116,22 @@ CONFIDENCE_SMOOTHING_WINDOW = deque(maxlen=CONSECUTIVE_DETECTIONS_REQUIRED)
 mic_index = int(sys.argv[1]) if len(sys.argv) > 1 else None
 print(f"🐍 [Python] Requested microphone index: {mic_index}", flush=True)
 
+# Captured chunks, filled from PortAudio's own thread (callback mode) so
+# capture keeps running while Python is busy with VAD or saving a recording
+audio_q = queue.Queue()
+
+
+def audio_callback(in_data, frame_count, time_info, status):
+    """PortAudio thread: hand each captured chunk to the main loop"""
+    audio_q.put(in_data)
+    return (None, pyaudio.paContinue)
+
+
+def read_chunk():
+    """Next CHUNK of int16 audio as bytes, waiting for capture if needed"""
+    return audio_q.get()
+
+
 # Setup audio
 p = pyaudio.PyAudio()
 stream_kwargs = {
@@ -88,6 +140,7 @@ stream_kwargs = {
     "rate": RATE,
     "input": True,
     "frames_per_buffer": CHUNK,
+    "stream_callback": audio_callback,
 }
 
 # Try to open with specified microphone, fall back to default if it fails
@@ -119,6 +172,16 @@ if stream is None:
 # Flags for manual recording control
 record_next = threading.Event()
 stop_recording = threading.Event()
+vibration_active = threading.Event()  # Set while the daemon plays vibration.wav
+
+# Wake word detection runs on a worker thread fed with pre-buffer snapshots
+detect_q = queue.Queue(maxsize=2)
+wake_detected = threading.Event()
+detection_epoch = 0  # Bumped after each recording so stale snapshots can't re-trigger
+detection_lock = threading.Lock()  # Epoch check + set vs. epoch bump + clear
+
+# Finished always-listening segments, analyzed on their own worker thread
+segment_q = queue.Queue()
 
 # Always-listening mode state
 speech_buffer = []  # Accumulate speech chunks
@@ -134,16 +197,25 @@ def stdin_listener():
 
     while True:
         try:
-            if select.select([sys.stdin], [], [], 0.1)[0]:
-                line = sys.stdin.readline().strip()
-                print(f"DEBUG: stdin received line: '{line}'", flush=True)
-                if line == "RECORD_NOW":
-                    print("DEBUG: Received RECORD_NOW command", flush=True)
-                    record_next.set()
-                    stop_recording.clear()
-                elif line == "STOP_RECORDING":
-                    print("DEBUG: Received STOP_RECORDING command", flush=True)
-                    stop_recording.set()
+            # Blocking read - the thread sleeps until Node.js sends a command
+            # instead of waking up to poll
+            line = sys.stdin.readline()
+            if not line:  # EOF - parent closed stdin
+                print("DEBUG: stdin closed, stdin_listener exiting", flush=True)
+                break
+            line = line.strip()
+            print(f"DEBUG: stdin received line: '{line}'", flush=True)
+            if line == "RECORD_NOW":
+                print("DEBUG: Received RECORD_NOW command", flush=True)
+                record_next.set()
+                stop_recording.clear()
+            elif line == "STOP_RECORDING":
+                print("DEBUG: Received STOP_RECORDING command", flush=True)
+                stop_recording.set()
+            elif line == "VIBRATION_PLAYING":
+                vibration_active.set()
+            elif line == "VIBRATION_DONE":
+                vibration_active.clear()
         except Exception as e:
             print(f"DEBUG: stdin_listener error: {e}", flush=True)
 
@@ -156,74 +228,40 @@ print("READY", flush=True)
 
 
 def downsample_for_detection(audio_48k):
-    """Downsample 48kHz audio to 16kHz for wake word model"""
+    """Downsample 48kHz int16 audio to float32 16kHz for the wake word model and Silero"""
     audio_float = audio_48k.astype(np.float32) / 32768.0
-    audio_16k = librosa.resample(audio_float, orig_sr=RATE, target_sr=16000)
-    return audio_16k
-
+    return scipy.signal.resample_poly(audio_float, 1, RATE // 16000, window=DECIMATION_FILTER)
 
-def extract_features(audio_16k):
-    """Extract MFCC features with deltas for wake word detection"""
-    mfcc = librosa.feature.mfcc(y=audio_16k, sr=16000, n_mfcc=N_MFCC, hop_length=256)
 
-    if USE_DELTAS:
-        # Add delta and delta-delta features to match training
-        delta = librosa.feature.delta(mfcc)
-        delta2 = librosa.feature.delta(mfcc, order=2)
-        mfcc = np.vstack([mfcc, delta, delta2])
-
-    if mfcc.shape[1] < MAX_FRAMES:
-        pad_width = MAX_FRAMES - mfcc.shape[1]
-        mfcc = np.pad(mfcc, ((0, 0), (0, pad_width)), mode='constant')
-    else:
-        mfcc = mfcc[:, :MAX_FRAMES]
-
-    return mfcc.T
-
-
-def is_speech_silero(audio_data):
+def is_speech_silero(audio_16k):
     """
     Use Silero VAD to detect if audio contains speech.
     Silero VAD is state-of-the-art, much more accurate than WebRTC.
     Better at distinguishing speech from coughs, sniffs, keyboard, background noise.
+    Takes float32 [-1, 1] audio at 16kHz (Silero requirement), as returned by
+    downsample_for_detection.
 
     Returns: (is_speech, confidence, debug_info)
     """
-    # Convert to numpy array if needed
-    if isinstance(audio_data, list):
-        audio_array = np.frombuffer(b''.join(audio_data), dtype=np.int16)
-    elif isinstance(audio_data, bytes):
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
-    else:
-        audio_array = audio_data
-
-    # Convert to float32 [-1, 1]
-    audio_float = audio_array.astype(np.float32) / 32768.0
-
-    # Resample to 16kHz (Silero requirement)
-    if RATE != 16000:
-        audio_float = librosa.resample(audio_float, orig_sr=RATE, target_sr=16000)
-
     # Silero requires 512 samples (32ms at 16kHz) per chunk
     chunk_size = 512
-    num_chunks = len(audio_float) // chunk_size
+    num_chunks = len(audio_16k) // chunk_size
 
     if num_chunks < 1:
         return False, 0.0, "too_short"
 
-    # Process each chunk and average probabilities
-    speech_probs = []
-    for i in range(num_chunks):
-        chunk = audio_float[i * chunk_size:(i + 1) * chunk_size]
-        audio_tensor = torch.from_numpy(chunk)
-        prob = model_vad(audio_tensor, 16000).item()
-        speech_probs.append(prob)
+    # Score every chunk in one audio_forward call: the model steps its LSTM
+    # state over the chunks inside TorchScript (starting from a fresh state)
+    # instead of one Python call and .item() sync per chunk
+    audio_tensor = torch.from_numpy(np.ascontiguousarray(audio_16k[:num_chunks * chunk_size]))
+    with torch.no_grad():
+        speech_probs = model_vad.audio_forward(audio_tensor, 16000)[0].numpy()
 
     # Average probability across all chunks
-    avg_speech_prob = np.mean(speech_probs)
+    avg_speech_prob = float(speech_probs.mean())
 
     # Count how many chunks are speech
-    speech_chunks = sum(1 for p in speech_probs if p >= 0.5)
+    speech_chunks = int(np.count_nonzero(speech_probs >= 0.5))
 
     # Threshold: require 30% of chunks to be speech
     # This allows short utterances while filtering coughs/sniffs
@@ -234,44 +272,48 @@ def is_speech_silero(audio_data):
     return is_speech, avg_speech_prob, debug_info
 
 
-def is_silent(audio_data, threshold=0.01):
-    """Check if audio is too quiet"""
-    audio = np.array(audio_data, dtype=np.float32) / 32768.0
-    rms = np.sqrt(np.mean(audio**2))
-    return rms < threshold
-
-
-def has_sufficient_energy(audio_data, threshold=0.04):
+def has_sufficient_energy(energy, num_samples, threshold=0.04):
     """
     Check if audio has sufficient energy to be actual speech.
     Filters out low-energy background noise that might trigger false positives.
     Threshold increased to 0.04 to ignore quiet sounds like trackpad clicks.
     """
-    audio = np.array(audio_data, dtype=np.float32) / 32768.0
-    rms = np.sqrt(np.mean(audio**2))
-    return rms >= threshold
+    return energy >= (threshold * 32768.0) ** 2 * num_samples
 
 
-def has_speech_characteristics(audio_16k):
+def has_speech_zero_crossing_rate(audio_16k, low=0.005, high=0.45):
+    """
+    Cheap O(N) pre-filter before any STFT/MFCC work.
+    Speech windows cross zero at a moderate rate (a low 100Hz voice is still
+    above 1%); rumble barely crosses, white hiss crosses on every other sample.
+    The band is kept wide so real speech is never rejected here.
+    """
+    zcr = np.count_nonzero(np.diff(np.signbit(audio_16k))) / len(audio_16k)
+    return low <= zcr <= high
+
+
+def spectrum_band_energy(audio_16k):
+    """
+    STFT magnitude (n_fft=2048, hop=512, same values as librosa.stft) summed
+    over frames, one value per frequency bin. Computed once per window and
+    shared by has_speech_characteristics and is_vibration_sound.
+    """
+    padded = np.pad(audio_16k.astype(np.float32, copy=False), 2048 // 2)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, 2048)[::512]
+    return np.abs(scipy.fft.rfft(frames * FFT_WINDOW, axis=1)).sum(axis=0)
+
+
+def has_speech_characteristics(band_energy):
     """
     Check if audio has speech-like spectral characteristics.
     Human speech has strong energy in 300-3400 Hz range.
+    Takes the per-bin energy from spectrum_band_energy.
     Returns True if audio looks like speech, False for background noise.
     """
-    # Calculate power spectral density
-    stft = librosa.stft(audio_16k, n_fft=2048, hop_length=512)
-    magnitude = np.abs(stft)
-    freqs = librosa.fft_frequencies(sr=16000, n_fft=2048)
-
     # Speech fundamental frequency range (85-255 Hz for male/female voices)
     # Speech formant range (300-3400 Hz - main energy of speech)
-    speech_low = 300
-    speech_high = 3400
-
-    # Calculate energy in speech frequency band
-    speech_mask = (freqs >= speech_low) & (freqs <= speech_high)
-    speech_energy = np.sum(magnitude[speech_mask, :])
-    total_energy = np.sum(magnitude)
+    speech_energy = band_energy[SPEECH_BAND].sum()
+    total_energy = band_energy.sum()
 
     if total_energy < 1e-10:
         return False
@@ -312,7 +354,7 @@ def is_impulsive_sound(audio_data, verbose=False):
 
     # Calculate zero-crossing rate (how often signal changes sign)
     # Speech: moderate, Impulsive sounds: very high or very low
-    zero_crossings = np.sum(np.abs(np.diff(np.sign(audio)))) / 2
+    zero_crossings = np.count_nonzero(np.diff(np.signbit(audio)))
     zcr = zero_crossings / len(audio)
 
     # Calculate envelope smoothness
@@ -321,23 +363,21 @@ def is_impulsive_sound(audio_data, verbose=False):
     if len(audio) < chunk_size * 3:
         return True, {"reason": "too_short_for_speech"}
 
+    # RMS of every whole chunk in one reshape + axis reduction
     num_chunks = len(audio) // chunk_size
-    chunk_energies = []
-    for i in range(num_chunks):
-        chunk = audio[i * chunk_size:(i + 1) * chunk_size]
-        chunk_energy = np.sqrt(np.mean(chunk ** 2))
-        chunk_energies.append(chunk_energy)
+    chunks = audio[:num_chunks * chunk_size].reshape(num_chunks, chunk_size)
+    chunk_energies = np.sqrt(np.mean(chunks ** 2, axis=1))
 
     if len(chunk_energies) < 3:
         return True, {"reason": "insufficient_chunks"}
 
     # Coefficient of variation (stddev / mean)
     # Speech: 0.3-0.8 (relatively smooth), Impulsive: 1.0+ (very spiky)
-    mean_energy = np.mean(chunk_energies)
+    mean_energy = chunk_energies.mean()
     if mean_energy < 1e-6:
         return False, {"reason": "silent"}
 
-    cv = np.std(chunk_energies) / mean_energy
+    cv = chunk_energies.std() / mean_energy
 
     # Decision logic
     # High crest factor = sharp transient (cough, sniff, click)
@@ -357,34 +397,19 @@ def is_impulsive_sound(audio_data, verbose=False):
     return is_impulsive, details
 
 
-def is_vibration_sound(audio_16k):
+def is_vibration_sound(band_energy):
     """
     Detect if audio matches the vibration sound pattern.
     Vibration sound is a low-frequency tone (~42Hz) with harmonics.
+    Takes the per-bin energy from spectrum_band_energy.
     Returns True if audio looks like the vibration sound.
     """
-    # Calculate power spectral density
-    stft = librosa.stft(audio_16k, n_fft=2048, hop_length=512)
-    magnitude = np.abs(stft)
-    freqs = librosa.fft_frequencies(sr=16000, n_fft=2048)
-    
-    # Vibration sound frequency range (40-50Hz, with harmonics at 84-100Hz, 126-150Hz)
-    vibration_freq_low = 40
-    vibration_freq_high = 50
-    harmonic2_low = 80
-    harmonic2_high = 100
-    harmonic3_low = 120
-    harmonic3_high = 150
-    
-    # Calculate energy in vibration frequency bands
-    vibration_mask = (freqs >= vibration_freq_low) & (freqs <= vibration_freq_high)
-    harmonic2_mask = (freqs >= harmonic2_low) & (freqs <= harmonic2_high)
-    harmonic3_mask = (freqs >= harmonic3_low) & (freqs <= harmonic3_high)
-    
-    vibration_energy = np.sum(magnitude[vibration_mask, :])
-    harmonic2_energy = np.sum(magnitude[harmonic2_mask, :])
-    harmonic3_energy = np.sum(magnitude[harmonic3_mask, :])
-    total_energy = np.sum(magnitude)
+    # Every band is a short slice of the per-bin energy
+    # (vibration 40-50Hz, harmonics at 80-100Hz and 120-150Hz)
+    vibration_energy = band_energy[VIBRATION_BAND].sum()
+    harmonic2_energy = band_energy[HARMONIC2_BAND].sum()
+    harmonic3_energy = band_energy[HARMONIC3_BAND].sum()
+    total_energy = band_energy.sum()
     
     # Calculate ratios
     if total_energy < 1e-10:
@@ -398,9 +423,7 @@ def is_vibration_sound(audio_16k):
     # - High energy in 40-50Hz range (>30% of total energy)
     # - Significant harmonic energy (>10% in second harmonic, >5% in third)
     # - Low energy above 200Hz (most energy concentrated in low frequencies)
-    high_freq_mask = freqs > 200
-    high_freq_energy = np.sum(magnitude[high_freq_mask, :])
-    high_freq_ratio = high_freq_energy / total_energy
+    high_freq_ratio = band_energy[HIGH_FREQ_BAND].sum() / total_energy
     
     is_vibration = (
         vibration_ratio > 0.30 and  # Strong fundamental frequency
@@ -412,42 +435,51 @@ def is_vibration_sound(audio_16k):
     return is_vibration
 
 
-def calculate_rms(audio_chunk):
-    """Calculate RMS for VAD"""
-    audio_array = np.frombuffer(audio_chunk, dtype=np.int16)
-    if len(audio_array) == 0:
-        return 0
-    rms_value = np.sqrt(np.mean(audio_array.astype(np.float64)**2))
-    if np.isnan(rms_value) or np.isinf(rms_value):
+def calculate_rms(audio_chunk, energy=None):
+    """
+    Calculate RMS of an int16 chunk for VAD. Pass its sum of squares when
+    it's already known (RingBuffer.write returns it) to skip the second pass.
+    """
+    if len(audio_chunk) == 0:
         return 0
-    return int(rms_value)
+    if energy is None:
+        energy = sum_of_squares(audio_chunk)
+    # Exact integer energy - can't be NaN/inf
+    return int(np.sqrt(energy / audio_chunk.size))
+
+
+recording_file_lock = threading.Lock()  # Main loop and segment worker both write command.wav
 
 
-def save_recording(frames, filename="command.wav"):
-    """Save recorded audio to WAV file"""
-    wf = wave.open(filename, 'wb')
-    wf.setnchannels(1)
-    wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
-    wf.setframerate(RATE)
-    wf.writeframes(b''.join(frames))
-    wf.close()
+def save_recording(audio, filename="command.wav"):
+    """Save recorded int16 audio (any bytes-like object) to WAV file"""
+    with recording_file_lock:
+        wf = wave.open(filename, 'wb')
+        wf.setnchannels(1)
+        wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
+        wf.setframerate(RATE)
+        wf.writeframes(audio)
+        wf.close()
 
 
 def record_command():
     """Record audio after wake word until silence detected or manual stop"""
     print(f"DEBUG: record_command() started", flush=True)
-    frames = []
-
-    # Include pre-buffer (1.5s before wake word)
-    for chunk in pre_buffer:
-        frames.append(chunk.tobytes())
-
-    print(f"DEBUG: Pre-buffer included ({len(pre_buffer)} chunks)", flush=True)
-
     silence_chunks = 0
     recording_chunks = 0
     max_chunks = int((MAX_RECORDING_DURATION * RATE) / CHUNK)
 
+    # Chunks are copied straight into one buffer sized for the longest
+    # possible recording, so saving needs no join
+    recording = np.empty(pre_buffer_size + max_chunks * CHUNK, dtype=np.int16)
+
+    # Include pre-buffer (1.5s before wake word)
+    pre_roll = pre_buffer.window()
+    recording[:pre_roll.size] = pre_roll
+    pos = pre_roll.size
+
+    print(f"DEBUG: Pre-buffer included ({pre_roll.size} samples)", flush=True)
+
     print(f"DEBUG: Entering recording loop (max {max_chunks} chunks)", flush=True)
     while recording_chunks < max_chunks:
         # Check for manual stop command
@@ -456,18 +488,19 @@ def record_command():
             stop_recording.clear()
             break
 
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        frames.append(data)
+        # Decode the chunk once; the same int16 view is stored and measured
+        audio_chunk = np.frombuffer(read_chunk(), dtype=np.int16)
+        recording[pos:pos + audio_chunk.size] = audio_chunk
+        pos += audio_chunk.size
         recording_chunks += 1
 
         # Voice Activity Detection
-        rms = calculate_rms(data)
+        rms = calculate_rms(audio_chunk)
 
         if rms < SILENCE_THRESHOLD:
             silence_chunks += 1
             if silence_chunks % 5 == 0:  # Log every 5 chunks
-                total_chunks = len(frames)
-                print(f"DEBUG: Silence chunks={silence_chunks}/{total_chunks}, RMS={rms}", flush=True)
+                print(f"DEBUG: Silence chunks={silence_chunks}/{recording_chunks}, RMS={rms}", flush=True)
         else:
             silence_chunks = 0  # Reset on voice detected
 
@@ -476,15 +509,187 @@ def record_command():
             print(f"DEBUG: Stopping - silence detected ({silence_chunks} chunks)", flush=True)
             break
 
-    print(f"DEBUG: Recording loop ended, total {len(frames)} chunks", flush=True)
+    print(f"DEBUG: Recording loop ended, total {recording_chunks} chunks", flush=True)
     # Save to file
     print(f"DEBUG: Saving recording to command.wav", flush=True)
-    save_recording(frames)
+    save_recording(recording[:pos])
     print(f"DEBUG: Recording saved, sending RECORDING_COMPLETE", flush=True)
     print("RECORDING_COMPLETE", flush=True)
     print(f"DEBUG: RECORDING_COMPLETE sent", flush=True)
 
 
+def detect_wake_word(window, energy):
+    """
+    Run the wake word checks on one 48kHz pre-buffer window and its running
+    sum of squares. Returns (confidence, reason) when it should trigger, else None.
+    """
+    # Skip if too quiet
+    if is_silent(energy, window.size):
+        CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on silence
+        return None
+
+    # Skip if insufficient energy (likely background noise)
+    if not has_sufficient_energy(energy, window.size):
+        CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on low energy
+        return None
+
+    # Downsample for wake word detection
+    audio_16k = downsample_for_detection(window)
+
+    # Skip obvious non-speech (hum, hiss) before any spectral work
+    if not has_speech_zero_crossing_rate(audio_16k):
+        CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on non-speech audio
+        return None
+
+    # One STFT shared by the vibration and speech checks
+    band_energy = spectrum_band_energy(audio_16k)
+
+    # Skip if this is the vibration sound playing (only possible while
+    # the daemon says it is)
+    if vibration_active.is_set() and is_vibration_sound(band_energy):
+        CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on vibration sound
+        return None
+
+    # Skip if audio doesn't have speech-like characteristics
+    if not has_speech_characteristics(band_energy):
+        CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on non-speech audio
+        return None
+
+    # Extract features and run detection
+    prediction = wake_model(extract_features(audio_16k, N_MFCC, MAX_FRAMES, USE_DELTAS))
+
+    # Very high confidence triggers immediately (likely real "Jarvis")
+    if prediction >= HIGH_CONFIDENCE_THRESHOLD:
+        CONFIDENCE_SMOOTHING_WINDOW.clear()
+        return prediction, "high confidence"
+
+    # Medium confidence requires consecutive detections (reduces false positives)
+    if prediction >= MEDIUM_CONFIDENCE_THRESHOLD:
+        CONFIDENCE_SMOOTHING_WINDOW.append(prediction)
+
+        if len(CONFIDENCE_SMOOTHING_WINDOW) >= CONSECUTIVE_DETECTIONS_REQUIRED:
+            avg_confidence = sum(CONFIDENCE_SMOOTHING_WINDOW) / len(CONFIDENCE_SMOOTHING_WINDOW)
+
+            # Only trigger if average is still above medium threshold
+            if avg_confidence >= MEDIUM_CONFIDENCE_THRESHOLD:
+                CONFIDENCE_SMOOTHING_WINDOW.clear()
+                return avg_confidence, "consecutive"
+        return None
+
+    # Low confidence - reset smoothing window
+    CONFIDENCE_SMOOTHING_WINDOW.clear()
+    return None
+
+
+def detection_worker():
+    """Run wake word detection off the main loop so chunks are consumed without stalls"""
+    while True:
+        epoch, window, energy = detect_q.get()
+        # A failure on one window must not end detection for the session -
+        # this is a daemon thread, so an uncaught error would die silently
+        try:
+            detection = detect_wake_word(window, energy)
+        except Exception as e:
+            print(f"DEBUG: detection_worker error: {e}", flush=True)
+            traceback.print_exc()
+            continue
+
+        if not detection:
+            continue
+        # Ignore windows captured before the last recording started. Checked
+        # and set under the lock so a reset can't land between the two
+        with detection_lock:
+            if epoch == detection_epoch and not wake_detected.is_set():
+                confidence, reason = detection
+                print(f"DETECTED:{confidence:.3f} ({reason})", flush=True)
+                wake_detected.set()  # Main loop records the command
+
+
+if not no_wake_word:
+    detection_thread = threading.Thread(target=detection_worker, daemon=True)
+    detection_thread.start()
+
+
+def analyze_speech_segment(speech_array):
+    """Score one finished always-listening segment and emit it if it's speech"""
+    # Calculate basic stats
+    rms = calculate_rms(speech_array)
+    duration_ms = int(len(speech_array) / RATE * 1000)
+
+    # Downsample once for both Silero and the wake word model
+    audio_16k = downsample_for_detection(speech_array)
+
+    wake_word_confidence = 0.0
+    rejected_reason = None
+    vad_debug = ""
+
+    # Check if it's the vibration sound first: a single STFT, and only while
+    # the sound is playing - cheaper than running Silero over the segment.
+    # Either way the segment is dropped, so the order only changes the label
+    if vibration_active.is_set() and is_vibration_sound(spectrum_band_energy(audio_16k)):
+        rejected_reason = "vibration"
+        debug_info = ""
+    else:
+        # Silero VAD - State-of-the-art speech detection
+        is_speech, speech_prob, vad_debug = is_speech_silero(audio_16k)
+
+        if not is_speech:
+            # Silero VAD says this is NOT speech
+            # (cough, sniff, keyboard, background noise, etc.)
+            rejected_reason = "non_speech"
+            debug_info = f" {vad_debug}"
+        elif wake_model is not None:
+            # Silero VAD confirms this is speech - run wake word detection
+            # (skipped with --no-wake-word, where no model is loaded)
+            wake_word_confidence = wake_model(extract_features(audio_16k, N_MFCC, MAX_FRAMES, USE_DELTAS))
+
+    # Concise debug output
+    if rejected_reason:
+        print(f"⊘ {rejected_reason} (rms={rms}, {duration_ms}ms{debug_info})", flush=True)
+    else:
+        print(f"✓ speech (rms={rms}, {duration_ms}ms, wake={wake_word_confidence:.2f}, {vad_debug})", flush=True)
+        # Only emit if Silero VAD confirms it's speech
+        save_recording(speech_array)
+        print(f"SPEECH_SEGMENT:{wake_word_confidence:.3f}", flush=True)
+
+
+def segment_worker():
+    """Run Silero VAD and the wake word model on finished segments off the main loop"""
+    while True:
+        speech_array = segment_q.get()
+        # Same as detection_worker: log a failed segment and keep serving the queue
+        try:
+            analyze_speech_segment(speech_array)
+        except Exception as e:
+            print(f"DEBUG: segment_worker error: {e}", flush=True)
+            traceback.print_exc()
+
+
+if always_listening:
+    segment_thread = threading.Thread(target=segment_worker, daemon=True)
+    segment_thread.start()
+
+
+def reset_detection():
+    """Start detection over after a recording: drop queued and in-flight windows"""
+    global detection_epoch
+    pre_buffer.clear()
+    with detection_lock:
+        detection_epoch += 1
+        wake_detected.clear()
+    while not detect_q.empty():
+        try:
+            detect_q.get_nowait()
+        except queue.Empty:
+            break
+
+
+# Everything loaded so far (torch, Silero, the interpreter, librosa) lives
+# for the whole process - move it out of the GC's reach so full collections
+# don't pause the threads feeding on the audio queue by rescanning it
+gc.collect()
+gc.freeze()
+
 # Main loop
 frame_count = 0
 cooldown_frames = 0
@@ -496,19 +701,27 @@ try:
             record_next.clear()
             print("DEBUG: Manual/follow-up recording triggered", flush=True)
             record_command()
-            pre_buffer.clear()
+            reset_detection()
+            frame_count = 0
+            continue
+
+        # Wake word found by the detection worker
+        if wake_detected.is_set():
+            cooldown_frames = 10
+            record_command()
+            reset_detection()
             frame_count = 0
             continue
 
-        data = stream.read(CHUNK, exception_on_overflow=False)
+        data = read_chunk()
         audio_chunk = np.frombuffer(data, dtype=np.int16)
 
         # Always add to pre-buffer (rolling window)
-        pre_buffer.extend(audio_chunk)
+        chunk_energy = pre_buffer.write(audio_chunk)
 
         # Always-listening mode: continuous speech detection with wake word boost
         if always_listening:
-            rms = calculate_rms(data)
+            rms = calculate_rms(audio_chunk, chunk_energy)
 
             # Lower threshold since WebRTC VAD will do the real filtering
             ACTIVITY_THRESHOLD = 400  # Just need to detect "something happening"
@@ -525,8 +738,7 @@ try:
                         silence_counter = 0
                         speech_buffer = []
                         # Include pre-buffer for context
-                        for chunk in pre_buffer:
-                            speech_buffer.append(chunk.tobytes())
+                        speech_buffer.append(pre_buffer.window().tobytes())
                 else:
                     # Continue accumulating speech
                     speech_buffer.append(data)
@@ -549,44 +761,9 @@ try:
                             # Convert to numpy array
                             speech_array = np.frombuffer(b''.join(speech_buffer), dtype=np.int16)
 
-                            # Calculate basic stats
-                            rms = int(np.sqrt(np.mean((speech_array.astype(np.float64) ** 2))))
-                            duration_ms = int(len(speech_array) / RATE * 1000)
-
-                            # Silero VAD - State-of-the-art speech detection
-                            is_speech, speech_prob, vad_debug = is_speech_silero(speech_buffer)
-
-                            wake_word_confidence = 0.0
-                            rejected_reason = None
-
-                            if not is_speech:
-                                # Silero VAD says this is NOT speech
-                                # (cough, sniff, keyboard, background noise, etc.)
-                                rejected_reason = "non_speech"
-                                debug_info = f" {vad_debug}"
-                            else:
-                                # Silero VAD confirms this is speech - check wake word
-                                audio_16k = downsample_for_detection(speech_array)
-
-                                # Check if it's the vibration sound
-                                is_vibration = is_vibration_sound(audio_16k)
-                                if is_vibration:
-                                    rejected_reason = "vibration"
-                                    debug_info = ""
-                                else:
-                                    # Run wake word detection
-                                    features = extract_features(audio_16k)
-                                    features = np.expand_dims(features, axis=0)
-                                    wake_word_confidence = model.predict(features, verbose=0)[0][0]
-
-                            # Concise debug output
-                            if rejected_reason:
-                                print(f"⊘ {rejected_reason} (rms={rms}, {duration_ms}ms{debug_info})", flush=True)
-                            else:
-                                print(f"✓ speech (rms={rms}, {duration_ms}ms, wake={wake_word_confidence:.2f}, {vad_debug})", flush=True)
-                                # Only emit if Silero VAD confirms it's speech
-                                save_recording(speech_buffer)
-                                print(f"SPEECH_SEGMENT:{wake_word_confidence:.3f}", flush=True)
+                            # Silero + wake word scoring runs on the segment worker
+                            # so capture keeps being consumed meanwhile
+                            segment_q.put(speech_array)
 
                             speech_buffer = []
                 else:
@@ -603,65 +780,15 @@ try:
 
         # Run wake word detection every 8 frames (reduced frequency to minimize false positives)
         frame_count += 1
-        if frame_count >= 8 and len(pre_buffer) >= pre_buffer_size and cooldown_frames == 0:
+        if frame_count >= 8 and pre_buffer.full and cooldown_frames == 0:
             frame_count = 0
 
-            # Skip if too quiet
-            if is_silent(list(pre_buffer)):
-                CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on silence
-                continue
-
-            # Skip if insufficient energy (likely background noise)
-            if not has_sufficient_energy(list(pre_buffer)):
-                CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on low energy
-                continue
-
-            # Downsample for wake word detection
-            audio_16k = downsample_for_detection(np.array(list(pre_buffer)))
-
-            # Skip if this is the vibration sound playing
-            if is_vibration_sound(audio_16k):
-                CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on vibration sound
-                continue
-
-            # Skip if audio doesn't have speech-like characteristics
-            if not has_speech_characteristics(audio_16k):
-                CONFIDENCE_SMOOTHING_WINDOW.clear()  # Reset smoothing on non-speech audio
-                continue
-
-            # Extract features and run detection
-            features = extract_features(audio_16k)
-            features = np.expand_dims(features, axis=0)
-            prediction = model.predict(features, verbose=0)[0][0]
-
-            # Very high confidence triggers immediately (likely real "Jarvis")
-            if prediction >= HIGH_CONFIDENCE_THRESHOLD:
-                print(f"DETECTED:{prediction:.3f} (high confidence)", flush=True)
-                cooldown_frames = 10
-                record_command()
-                pre_buffer.clear()
-                frame_count = 0
-                CONFIDENCE_SMOOTHING_WINDOW.clear()
-            
-            # Medium confidence requires consecutive detections (reduces false positives)
-            elif prediction >= MEDIUM_CONFIDENCE_THRESHOLD:
-                CONFIDENCE_SMOOTHING_WINDOW.append(prediction)
-                
-                if len(CONFIDENCE_SMOOTHING_WINDOW) >= CONSECUTIVE_DETECTIONS_REQUIRED:
-                    avg_confidence = np.mean(list(CONFIDENCE_SMOOTHING_WINDOW))
-                    
-                    # Only trigger if average is still above medium threshold
-                    if avg_confidence >= MEDIUM_CONFIDENCE_THRESHOLD:
-                        print(f"DETECTED:{avg_confidence:.3f} (consecutive)", flush=True)
-                        cooldown_frames = 10
-                        record_command()
-                        pre_buffer.clear()
-                        frame_count = 0
-                        CONFIDENCE_SMOOTHING_WINDOW.clear()
-            
-            # Low confidence - reset smoothing window
-            else:
-                CONFIDENCE_SMOOTHING_WINDOW.clear()
+            # Hand a snapshot to the detection worker; drop it if the worker
+            # is still busy so capture never waits on inference
+            try:
+                detect_q.put_nowait((detection_epoch, pre_buffer.window(), pre_buffer.energy))
+            except queue.Full:
+                pass
 
 except KeyboardInterrupt:
     pass
@@ -0,0 +1,207 @@
+"""
+Wake word features and model I/O shared by training, the model test and the
+real-time detectors, so every path computes exactly the same MFCCs
+"""
+
+import threading
+from functools import lru_cache
+import numpy as np
+import librosa
+import scipy.fft
+import scipy.signal
+
+SAMPLE_RATE = 16000
+
+# MFCC parameters (librosa.feature.mfcc defaults, hop_length=256)
+N_FFT = 2048
+HOP_LENGTH = 256
+N_MELS = 128
+TOP_DB = 80.0
+
+# Window and mel filterbank are fixed - build them once instead of inside
+# librosa.feature.mfcc for every window
+FFT_WINDOW = librosa.filters.get_window("hann", N_FFT, fftbins=True).astype(np.float32)
+MEL_BASIS = librosa.filters.mel(sr=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS)
+
+# librosa.feature.delta is a 9-frame Savitzky-Golay derivative (polyorder =
+# order); precompute both kernels in the same frame order as the windows
+DELTA_WIDTH = 9
+DELTA_KERNELS = np.stack([
+    scipy.signal.savgol_coeffs(DELTA_WIDTH, 1, deriv=1, use="dot"),
+    scipy.signal.savgol_coeffs(DELTA_WIDTH, 2, deriv=2, use="dot"),
+], axis=1).astype(np.float32)  # (DELTA_WIDTH, 2): delta and delta-delta
+
+@lru_cache
+def dct_basis(n_mfcc):
+    """Orthonormal DCT-II rows mapping N_MELS log-mel bands to n_mfcc coefficients"""
+    return scipy.fft.dct(np.eye(N_MELS, dtype=np.float32), type=2, norm="ortho", axis=0)[:n_mfcc]
+
+def mfcc(audio, n_mfcc):
+    """
+    librosa.feature.mfcc(y=audio, sr=SAMPLE_RATE, n_mfcc=n_mfcc,
+    hop_length=HOP_LENGTH) as (frames, n_mfcc), from the precomputed bases
+    """
+    # Centered STFT power spectrum (zero padding, Hann window). Everything
+    # stays float32; scipy's rfft reuses its cached plan for the fixed N_FFT
+    padded = np.pad(audio.astype(np.float32, copy=False), N_FFT // 2)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP_LENGTH]
+    spectrum = scipy.fft.rfft(frames * FFT_WINDOW, axis=1)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+
+    # Log-mel (power_to_db with ref=1.0, top_db=80) then DCT-II
+    log_mel = 10.0 * np.log10(np.maximum(MEL_BASIS @ power.T, 1e-10))
+    np.maximum(log_mel, log_mel.max() - TOP_DB, out=log_mel)
+    return (dct_basis(n_mfcc) @ log_mel).T
+
+def deltas(mfcc):
+    """
+    librosa.feature.delta(mfcc.T, order=1 and 2) for (frames, n_mfcc), as one
+    (frames, 2 * n_mfcc) array [delta | delta-delta] from a single matmul.
+    Its polynomial fits are linear/quadratic, so the first and last 4
+    frames just repeat the nearest full-window value.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(mfcc, DELTA_WIDTH, axis=0)
+    edge = DELTA_WIDTH // 2
+    both = (windows @ DELTA_KERNELS).transpose(0, 2, 1).reshape(len(windows), -1)
+    return np.pad(both, ((edge, edge), (0, 0)), mode='edge')
+
+def fit_frames(features, max_frames):
+    """Zero-pad or truncate (frames, dim) features to exactly max_frames frames"""
+    if features.shape[0] < max_frames:
+        return np.pad(features, ((0, max_frames - features.shape[0]), (0, 0)), mode='constant')
+    return features[:max_frames]
+
+def extract_features(audio, n_mfcc, max_frames, use_deltas):
+    """
+    Model input for float32 [-1, 1] audio at SAMPLE_RATE: MFCCs, plus delta
+    and delta-delta when the model was trained with them, fitted to
+    max_frames. Returns (max_frames, features)
+    """
+    features = mfcc(audio, n_mfcc)
+    if use_deltas:
+        features = np.hstack([features, deltas(features)])
+    return fit_frames(features, max_frames)
+
+def is_silent(energy, num_samples, threshold=0.01):
+    """Check if audio with this int16 sum of squares is too quiet to be speech"""
+    # Compared as raw int16-scale energy, so no sqrt or normalization
+    return energy < (threshold * 32768.0) ** 2 * num_samples
+
+def sum_of_squares(audio):
+    """Exact energy of int16 samples"""
+    audio = audio.astype(np.int64)
+    return int(np.dot(audio, audio))
+
+class RingBuffer:
+    """
+    The most recent `size` int16 samples, written in place, with their exact
+    sum of squares kept current so silence checks don't rescan the window
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.samples = np.zeros(size, dtype=np.int16)
+        self.write_index = 0
+        self.buffered = 0
+        self.energy = 0
+
+    @property
+    def full(self):
+        return self.buffered >= self.size
+
+    def write(self, chunk):
+        """Append samples, overwriting the oldest; returns the chunk's energy"""
+        chunk = chunk[-self.size:]
+        n = chunk.size
+        end = self.write_index + n
+        # Drop the energy of the samples being overwritten (zeros until the
+        # buffer first fills) and add the new chunk's
+        if end <= self.size:
+            self.energy -= sum_of_squares(self.samples[self.write_index:end])
+            self.samples[self.write_index:end] = chunk
+        else:
+            split = self.size - self.write_index
+            self.energy -= sum_of_squares(self.samples[self.write_index:]) + sum_of_squares(self.samples[:n - split])
+            self.samples[self.write_index:] = chunk[:split]
+            self.samples[:n - split] = chunk[split:]
+        chunk_energy = sum_of_squares(chunk)
+        self.energy += chunk_energy
+        self.write_index = end % self.size
+        self.buffered = min(self.buffered + n, self.size)
+        return chunk_energy
+
+    def window(self):
+        """The buffered samples in chronological order"""
+        if not self.full:
+            return self.samples[:self.write_index].copy()
+        return np.concatenate((self.samples[self.write_index:], self.samples[:self.write_index]))
+
+    def clear(self):
+        """Drop everything buffered"""
+        self.samples.fill(0)
+        self.write_index = 0
+        self.buffered = 0
+        self.energy = 0
+
+def load_interpreter(model_path="jarvis_model/model.tflite", num_threads=2):
+    """
+    TFLite interpreter for the exported model. Prefers the standalone runtime
+    - ai_edge_litert, successor of tflite_runtime and the one with macOS
+    wheels - over importing all of TensorFlow. The interpreter applies the
+    XNNPACK delegate by default (NEON on Apple Silicon, AVX on x86)
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+class WakeWordModel:
+    """The int8 TFLite detector; safe to call from several threads"""
+
+    def __init__(self, model_path="jarvis_model/model.tflite", metadata=None, num_threads=2):
+        self.interpreter = load_interpreter(model_path, num_threads)
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.input_index = self.input_details["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.lock = threading.Lock()
+
+        # Per-feature standardization from training (metadata.json), folded
+        # into one multiply-add with the int8 input scale/zero point. MFCC c0
+        # spans hundreds of units while deltas are about ±1, so one shared
+        # int8 scale over raw features would round most deltas to zero.
+        # Models exported without the stats take raw features
+        metadata = metadata or {}
+        mean = np.asarray(metadata.get("feature_mean", 0.0), dtype=np.float32)
+        std = np.asarray(metadata.get("feature_std", 1.0), dtype=np.float32)
+        scale, zero_point = 1.0, 0
+        if self.input_details["dtype"] == np.int8:
+            scale, zero_point = self.input_details["quantization"]
+        self.input_multiplier = 1.0 / (std * scale)
+        self.input_offset = zero_point - mean * self.input_multiplier
+
+    def quantize(self, x):
+        """Standardized features in the model's input dtype (int8 is quantized here, not in a model op)"""
+        x = x * self.input_multiplier + self.input_offset
+        if self.input_details["dtype"] == np.int8:
+            return np.clip(np.round(x), -128, 127).astype(np.int8)
+        return x.astype(np.float32)
+
+    def __call__(self, features):
+        """Wake word probability for one (MAX_FRAMES, features) window"""
+        x = self.quantize(features[None])
+        with self.lock:
+            self.interpreter.set_tensor(self.input_index, x)
+            self.interpreter.invoke()
+            return float(self.interpreter.get_tensor(self.output_index)[0, 0])
+
+    def warm_up(self, runs=2):
+        """Invoke on silence so delegate setup doesn't land on the first real detection"""
+        for _ in range(runs):
+            self(np.zeros(self.input_details["shape"][1:], dtype=np.float32))
@@ -194,6 +194,8 @@ function startVibrationSound() {
     console.error("Failed to start vibration sound:", error);
     vibrationSoundProcess = null;
   });
+
+  jarvis.setVibrationPlaying(true);
 }
 
 function stopVibrationSound() {
@@ -201,6 +203,7 @@ function stopVibrationSound() {
     // Kill the process
     vibrationSoundProcess.kill('SIGKILL');
     vibrationSoundProcess = null;
+    jarvis.setVibrationPlaying(false);
   }
 
   // Also kill any orphaned afplay processes playing the vibration sound
@@ -351,7 +354,7 @@ console.log("Claude Agent Manager initialized");
 // Start keyboard listener if in keyboard or both modes
 if (activationMode === "keyboard" || activationMode === "both") {
   console.log("Starting keyboard listener...");
-  keyboardListener = spawn("uvx", ["--with", "pynput", "python3", "scripts/keyboard_listener.py"]);
+  keyboardListener = spawn("uvx", ["--with", "pyobjc-framework-Quartz", "python3", "scripts/keyboard_listener.py"]);
 
   keyboardListener.stdout.on("data", async (data: Buffer) => {
     const message = data.toString().trim();
@@ -101,7 +101,7 @@ export class JarvisEngine {
 
     const args = [
       "--with",
-      "tensorflow",
+      "ai-edge-litert",
       "--with",
       "librosa",
       "--with",
@@ -754,6 +754,12 @@ Default to expectFollowUp=false unless absolutely necessary.`,
     }
   }
 
+  // Tell the detector whether the vibration sound is playing, so it only
+  // runs the vibration check while there is something to reject
+  setVibrationPlaying(playing: boolean) {
+    this.wakeWordDetector?.stdin?.write(playing ? "VIBRATION_PLAYING\n" : "VIBRATION_DONE\n");
+  }
+
   // Process text input directly (bypass speech recognition)
   async processTextInput(text: string): Promise<void> {
     console.log(`⌨️  Text input: "${text}"`);